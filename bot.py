@@ -5,26 +5,50 @@ Main entry point for the bot application.
 
 import asyncio
 import logging
+import logging.handlers
 import os
+import queue
 import sys
 from pathlib import Path
 
 import discord
 from discord.ext import commands
 
+# Use the libuv-based event loop where available (no Windows builds)
+if sys.platform != "win32":
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+
+try:
+    import httpx
+    import openai
+    OPENAI_AVAILABLE = True
+except ImportError:
+    OPENAI_AVAILABLE = False
+
 from config import Config
 from utils.database import Database
 from utils.status import StatusRotator
 
-# Configure logging
+# Configure logging - records are queued from the event loop and written
+# to the file/stdout handlers by a background listener thread
+log_queue = queue.SimpleQueue()
+log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+file_handler = logging.FileHandler('nova.log')
+file_handler.setFormatter(log_formatter)
+stream_handler = logging.StreamHandler(sys.stdout)
+stream_handler.setFormatter(log_formatter)
+
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('nova.log'),
-        logging.StreamHandler(sys.stdout)
-    ]
+    handlers=[logging.handlers.QueueHandler(log_queue)]
 )
+log_listener = logging.handlers.QueueListener(log_queue, file_handler, stream_handler)
+log_listener.start()
 
 logger = logging.getLogger(__name__)
 
@@ -44,12 +68,16 @@ class Nova(commands.Bot):
             intents=intents,
             help_command=None,
             case_insensitive=True,
-            strip_after_prefix=True
+            strip_after_prefix=True,
+            # Members are cached as they join; full member lists are
+            # chunked on demand by the commands that need them
+            chunk_guilds_at_startup=False
         )
         
         self.config = Config()
         self.db: Database = None
         self.status_rotator: StatusRotator = None
+        self.openai_client = None
         
     async def setup_hook(self) -> None:
         """Called when the bot is starting up"""
@@ -58,10 +86,14 @@ class Nova(commands.Bot):
         # Initialize database
         self.db = Database(self.config.MONGO_URL)
         await self.db.connect()
+        await self.db.create_indexes()
         
         # Initialize status rotator
         self.status_rotator = StatusRotator(self)
         
+        # Initialize the shared OpenAI client
+        self.openai_client = self.create_openai_client()
+        
         # Load all cogs
         await self.load_cogs()
         
@@ -72,6 +104,24 @@ class Nova(commands.Bot):
         except Exception as e:
             logger.error(f"Failed to sync commands: {e}")
     
+    def create_openai_client(self):
+        """Create one OpenAI client with a keep-alive HTTP/2 pool for all cogs"""
+        if not OPENAI_AVAILABLE or not self.config.OPENAI_API_KEY:
+            return None
+        
+        try:
+            return openai.AsyncOpenAI(
+                api_key=self.config.OPENAI_API_KEY,
+                http_client=httpx.AsyncClient(
+                    http2=True,
+                    limits=httpx.Limits(max_keepalive_connections=32, keepalive_expiry=60),
+                    timeout=httpx.Timeout(30.0, connect=5.0)
+                )
+            )
+        except Exception as e:
+            logger.error(f"Failed to initialize OpenAI client: {e}")
+            return None
+    
     async def load_cogs(self) -> None:
         """Load all cogs from the cogs directory"""
         cogs_to_load = [
@@ -89,12 +139,17 @@ class Nova(commands.Bot):
             "cogs.custom"
         ]
         
-        for cog_name in cogs_to_load:
-            try:
-                await self.load_extension(cog_name)
+        # Load concurrently so cogs doing I/O in setup don't block each other
+        results = await asyncio.gather(
+            *(self.load_extension(cog_name) for cog_name in cogs_to_load),
+            return_exceptions=True
+        )
+        
+        for cog_name, result in zip(cogs_to_load, results):
+            if isinstance(result, Exception):
+                logger.error(f"Failed to load cog {cog_name}: {result}")
+            else:
                 logger.info(f"Loaded cog: {cog_name}")
-            except Exception as e:
-                logger.error(f"Failed to load cog {cog_name}: {e}")
     
     async def on_ready(self) -> None:
         """Called when bot is ready"""
@@ -121,6 +176,9 @@ class Nova(commands.Bot):
             
         if self.db:
             await self.db.close()
+        
+        if self.openai_client:
+            await self.openai_client.close()
             
         await super().close()
 
@@ -137,6 +195,7 @@ async def main():
         logger.error(f"Bot error: {e}")
     finally:
         await bot.close()
+        log_listener.stop()
 
 
 if __name__ == "__main__":
@@ -4,11 +4,22 @@ Provides OpenAI-powered conversation functionality.
 """
 
 import asyncio
-from typing import Optional
+import hashlib
+import json
+import logging
+import random
+import re
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional, Tuple
 
 import discord
 from discord import app_commands
-from discord.ext import commands
+from discord.ext import commands, tasks
+from pymongo import ReturnDocument
+from pymongo.errors import PyMongoError
 
 from utils.embeds import EmbedBuilder
 
@@ -19,20 +30,158 @@ except ImportError:
     OPENAI_AVAILABLE = False
     print("OpenAI library not installed - AI features disabled")
 
+logger = logging.getLogger(__name__)
+
+# Upper bound on in-flight chat completion requests, and retry budget for rate limits
+OPENAI_MAX_CONCURRENCY = 8
+OPENAI_MAX_ATTEMPTS = 5
+
+# Minimum seconds between message edits while streaming an /ask answer
+STREAM_EDIT_INTERVAL = 1.0
+
+# Separators for multi-part questions (numbered list items, blank lines)
+QUESTION_SPLIT_PATTERN = re.compile(r"(?m)^\s*\d+[.)]\s+|\n{2,}")
+MAX_QUESTION_PARTS = 4
+
+# Discord limits for paging multi-part answers: embed description length,
+# and total embed characters / embeds per message
+EMBED_DESCRIPTION_LIMIT = 4096
+MAX_EMBED_CHARS_PER_MESSAGE = 6000
+MAX_EMBEDS_PER_MESSAGE = 10
+
+# Number of /ask answers kept in the in-process cache
+ANSWER_CACHE_SIZE = 512
+
+# System prompt shared by /ask and the batched /ask_queue path
+ASK_SYSTEM_MESSAGE = """You are Nova, a cute and helpful Discord bot with a kawaii personality! 
+            You should be friendly, enthusiastic, and use cute expressions occasionally. 
+            Use emojis sparingly but appropriately. Keep responses concise but helpful.
+            You love helping people and making them smile! 🌸"""
+
 
 class AIChat(commands.Cog):
     """AI-powered chat functionality using OpenAI"""
     
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.openai_client = None
         
-        # Initialize OpenAI client if available and API key is set
-        if OPENAI_AVAILABLE and hasattr(bot.config, 'OPENAI_API_KEY') and bot.config.OPENAI_API_KEY:
+        # Shared client owned by the bot (None if AI features are unavailable)
+        self.openai_client = getattr(bot, "openai_client", None)
+        
+        # Per-guild cache of the ai_chat_enabled flag: guild_id -> (enabled, fetched_at)
+        self._ai_enabled_cache: Dict[int, Tuple[bool, float]] = {}
+        self._cache_ttl = 300
+        
+        # Raw mention forms for the bot user, built on first use
+        self._mention_strings: Tuple[str, ...] = ()
+        
+        # LRU cache of /ask answers keyed by a hash of the prompt
+        self._answer_cache: OrderedDict = OrderedDict()
+        
+        # Queue excess completions client-side instead of overloading the API
+        self._openai_sem = asyncio.Semaphore(OPENAI_MAX_CONCURRENCY)
+        
+        self.flush_batch_queue.start()
+        self.poll_batch_jobs.start()
+    
+    def cog_unload(self):
+        """Clean up when cog is unloaded"""
+        self.flush_batch_queue.cancel()
+        self.poll_batch_jobs.cancel()
+    
+    async def _chat_create(self, **kwargs):
+        """Create a chat completion, bounded by the semaphore and retried on rate limits"""
+        for attempt in range(OPENAI_MAX_ATTEMPTS):
             try:
-                self.openai_client = openai.AsyncOpenAI(api_key=bot.config.OPENAI_API_KEY)
-            except Exception as e:
-                print(f"Failed to initialize OpenAI client: {e}")
+                async with self._openai_sem:
+                    return await self.openai_client.chat.completions.create(**kwargs)
+            except (openai.RateLimitError, openai.APITimeoutError):
+                if attempt == OPENAI_MAX_ATTEMPTS - 1:
+                    raise
+            
+            # Exponential backoff with jitter, outside the semaphore
+            await asyncio.sleep(min(30, 2 ** attempt) + random.random())
+    
+    @asynccontextmanager
+    async def _chat_stream(self, **kwargs):
+        """Stream a chat completion, holding a semaphore slot until the stream has been read"""
+        for attempt in range(OPENAI_MAX_ATTEMPTS):
+            await self._openai_sem.acquire()
+            try:
+                stream = await self.openai_client.chat.completions.create(stream=True, **kwargs)
+            except (openai.RateLimitError, openai.APITimeoutError):
+                self._openai_sem.release()
+                if attempt == OPENAI_MAX_ATTEMPTS - 1:
+                    raise
+                
+                # Exponential backoff with jitter, outside the semaphore
+                await asyncio.sleep(min(30, 2 ** attempt) + random.random())
+                continue
+            except BaseException:
+                self._openai_sem.release()
+                raise
+            
+            try:
+                yield stream
+            finally:
+                self._openai_sem.release()
+            return
+    
+    def _answer_key(self, question: str) -> bytes:
+        """Hash the /ask prompt into a cache key"""
+        return hashlib.blake2b(f"{ASK_SYSTEM_MESSAGE}\x1e{question}".encode(), digest_size=16).digest()
+    
+    async def _get_cached_answer(self, question: str) -> Optional[str]:
+        """Look up a previous answer in memory, then in the persistent cache"""
+        key = self._answer_key(question)
+        
+        if key in self._answer_cache:
+            self._answer_cache.move_to_end(key)
+            return self._answer_cache[key]
+        
+        try:
+            cached = await self.bot.db.ai_cache.find_one({"_id": key})
+        except PyMongoError as e:
+            logger.warning(f"Failed to read the /ask answer cache: {e}")
+            return None
+        
+        if cached:
+            self._remember_answer(key, cached["answer"])
+            return cached["answer"]
+        
+        return None
+    
+    async def _cache_answer(self, question: str, answer: str) -> None:
+        """Store an answer in memory and in the persistent cache (expires after a day)"""
+        key = self._answer_key(question)
+        self._remember_answer(key, answer)
+        
+        try:
+            await self.bot.db.ai_cache.update_one(
+                {"_id": key},
+                {"$set": {"answer": answer, "created_at": discord.utils.utcnow()}},
+                upsert=True
+            )
+        except PyMongoError as e:
+            logger.warning(f"Failed to write the /ask answer cache: {e}")
+    
+    def _remember_answer(self, key: bytes, answer: str) -> None:
+        """Insert into the in-process LRU, evicting the oldest entry when full"""
+        self._answer_cache[key] = answer
+        self._answer_cache.move_to_end(key)
+        if len(self._answer_cache) > ANSWER_CACHE_SIZE:
+            self._answer_cache.popitem(last=False)
+    
+    async def _is_ai_enabled(self, guild_id: int) -> bool:
+        """Check if AI chat is enabled for a guild, using the in-process cache"""
+        cached = self._ai_enabled_cache.get(guild_id)
+        if cached and time.monotonic() - cached[1] < self._cache_ttl:
+            return cached[0]
+        
+        guild_data = await self.bot.db.server_settings.find_one({"guild_id": guild_id})
+        enabled = bool(guild_data and guild_data.get("ai_chat_enabled", False))
+        self._ai_enabled_cache[guild_id] = (enabled, time.monotonic())
+        return enabled
     
     @app_commands.command(name="ask", description="🤖 Ask Nova a question using AI")
     @app_commands.describe(question="Your question for the AI")
@@ -50,39 +199,301 @@ class AIChat(commands.Cog):
         
         await interaction.response.defer()
         
+        # Answer independent sub-questions in parallel instead of one long generation
+        parts = self._split_questions(question)
+        if 1 < len(parts) <= MAX_QUESTION_PARTS:
+            try:
+                answers = await asyncio.gather(*(self._ask_one(part) for part in parts))
+                
+                # One embed per answer page, so long answers continue instead of being cut off
+                embeds = []
+                for part, answer in zip(parts, answers):
+                    answer = answer or "-"
+                    for start in range(0, len(answer), EMBED_DESCRIPTION_LIMIT):
+                        embeds.append(EmbedBuilder.create(
+                            title=part[:256] if start == 0 else f"{part[:240]} (cont.)",
+                            description=answer[start:start + EMBED_DESCRIPTION_LIMIT],
+                            color=discord.Color.from_rgb(177, 156, 217),
+                            footer_text=""
+                        ))
+                embeds[-1].set_footer(text=f"Asked by {interaction.user.display_name} | 🌸 Powered by Nova")
+                
+                for page in self._pack_embeds(embeds):
+                    await interaction.followup.send(embeds=page)
+            except Exception as e:
+                embed = EmbedBuilder.error(f"Failed to get AI response: {str(e)}")
+                await interaction.followup.send(embed=embed, ephemeral=True)
+            return
+        
         try:
-            # Create a kawaii system message
-            system_message = """You are Nova, a cute and helpful Discord bot with a kawaii personality! 
-            You should be friendly, enthusiastic, and use cute expressions occasionally. 
-            Use emojis sparingly but appropriately. Keep responses concise but helpful.
-            You love helping people and making them smile! 🌸"""
+            cached_answer = await self._get_cached_answer(question)
+            if cached_answer:
+                await interaction.followup.send(embed=self.build_ask_embed(interaction, question, cached_answer))
+                return
+            
+            # Edit the response as tokens arrive instead of waiting for the full answer
+            ai_response = ""
+            last_edit = time.monotonic()
+            last_length = 0
             
-            response = await self.openai_client.chat.completions.create(
+            async with self._chat_stream(
                 model="gpt-3.5-turbo",
                 messages=[
-                    {"role": "system", "content": system_message},
+                    {"role": "system", "content": ASK_SYSTEM_MESSAGE},
                     {"role": "user", "content": question}
                 ],
                 max_tokens=500,
                 temperature=0.8
+            ) as stream:
+                async for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    
+                    ai_response += chunk.choices[0].delta.content or ""
+                    now = time.monotonic()
+                    
+                    if ai_response and (now - last_edit > STREAM_EDIT_INTERVAL or len(ai_response) - last_length > 200):
+                        embed = self.build_ask_embed(interaction, question, ai_response + "▍")
+                        await interaction.edit_original_response(embed=embed)
+                        last_edit = now
+                        last_length = len(ai_response)
+            
+            embed = self.build_ask_embed(interaction, question, ai_response)
+            await interaction.edit_original_response(embed=embed)
+            
+            if ai_response:
+                await self._cache_answer(question, ai_response)
+            
+        except Exception as e:
+            embed = EmbedBuilder.error(f"Failed to get AI response: {str(e)}")
+            await interaction.followup.send(embed=embed, ephemeral=True)
+    
+    def _pack_embeds(self, embeds: List[discord.Embed]) -> List[List[discord.Embed]]:
+        """Group embeds into messages that stay within Discord's per-message limits"""
+        pages = [[]]
+        page_chars = 0
+        for embed in embeds:
+            if pages[-1] and (len(pages[-1]) == MAX_EMBEDS_PER_MESSAGE or page_chars + len(embed) > MAX_EMBED_CHARS_PER_MESSAGE):
+                pages.append([])
+                page_chars = 0
+            pages[-1].append(embed)
+            page_chars += len(embed)
+        return pages
+    
+    def _split_questions(self, question: str) -> List[str]:
+        """Split a multi-part question on numbered list items and blank lines"""
+        return [part.strip() for part in QUESTION_SPLIT_PATTERN.split(question) if part.strip()]
+    
+    async def _ask_one(self, question: str) -> str:
+        """Answer a single sub-question of a multi-part /ask"""
+        response = await self._chat_create(
+            model="gpt-3.5-turbo",
+            messages=[
+                {"role": "system", "content": ASK_SYSTEM_MESSAGE},
+                {"role": "user", "content": question}
+            ],
+            max_tokens=250,
+            temperature=0.8
+        )
+        return response.choices[0].message.content
+    
+    def build_ask_embed(self, interaction: discord.Interaction, question: str, answer: str) -> discord.Embed:
+        """Create the /ask response embed"""
+        embed = EmbedBuilder.create(
+            title="🤖 Nova AI Response",
+            description=answer,
+            color=discord.Color.from_rgb(177, 156, 217)
+        )
+        embed.add_field(name="Question", value=question, inline=False)
+        embed.set_footer(text=f"Asked by {interaction.user.display_name} | 🌸 Powered by Nova")
+        return embed
+    
+    @app_commands.command(name="ask_queue", description="📨 Queue a question to be answered in the next AI batch")
+    @app_commands.describe(question="Your question for the AI")
+    async def ask_queue(self, interaction: discord.Interaction, question: str):
+        """Queue a question for batched (non-interactive) answering"""
+        if not self.openai_client:
+            embed = EmbedBuilder.error("AI features are not available - missing OpenAI API key!")
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+            return
+        
+        if not interaction.guild:
+            embed = EmbedBuilder.error("This command can only be used in a server!")
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+            return
+        
+        if len(question) > 1000:
+            embed = EmbedBuilder.error("Question is too long! Please keep it under 1000 characters.")
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+            return
+        
+        # Persist the question so a restart before the next flush doesn't drop it
+        await self.bot.db.ai_batch_jobs.insert_one({
+            "status": "queued",
+            "custom_id": f"{interaction.guild_id}:{interaction.user.id}:{uuid.uuid4().hex}",
+            "channel_id": interaction.channel_id,
+            "user_id": interaction.user.id,
+            "question": question,
+            "created_at": discord.utils.utcnow()
+        })
+        
+        embed = EmbedBuilder.success(
+            "Your question has been queued! 📨\n"
+            "I'll post the answer in this channel once the batch is processed (this can take a while)."
+        )
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+    
+    @tasks.loop(minutes=30)
+    async def flush_batch_queue(self):
+        """Upload queued questions to the OpenAI Batch API"""
+        if not self.openai_client:
+            return
+        
+        try:
+            queued = await self.bot.db.ai_batch_jobs.find(
+                {"status": "queued"},
+                {"custom_id": 1, "channel_id": 1, "user_id": 1, "question": 1}
+            ).to_list(length=None)
+        except PyMongoError as e:
+            logger.error(f"Failed to read queued AI questions: {e}")
+            return
+        
+        if not queued:
+            return
+        
+        pending = [
+            {field: item[field] for field in ("custom_id", "channel_id", "user_id", "question")}
+            for item in queued
+        ]
+        lines = [
+            json.dumps({
+                "custom_id": item["custom_id"],
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": "gpt-3.5-turbo",
+                    "messages": [
+                        {"role": "system", "content": ASK_SYSTEM_MESSAGE},
+                        {"role": "user", "content": item["question"]}
+                    ],
+                    "max_tokens": 500,
+                    "temperature": 0.8
+                }
+            })
+            for item in pending
+        ]
+        
+        try:
+            batch_file = await self.openai_client.files.create(
+                file=("ask_batch.jsonl", "\n".join(lines).encode("utf-8")),
+                purpose="batch"
+            )
+            batch = await self.openai_client.batches.create(
+                input_file_id=batch_file.id,
+                endpoint="/v1/chat/completions",
+                completion_window="24h"
             )
             
-            ai_response = response.choices[0].message.content
+            await self.bot.db.ai_batch_jobs.insert_one({
+                "batch_id": batch.id,
+                "status": "pending",
+                "requests": pending,
+                "created_at": discord.utils.utcnow()
+            })
+            await self.bot.db.ai_batch_jobs.delete_many({"_id": {"$in": [item["_id"] for item in queued]}})
+        except Exception as e:
+            # The questions stay queued, so the next flush retries them
+            logger.error(f"Failed to submit AI batch: {e}")
+    
+    @tasks.loop(minutes=5)
+    async def poll_batch_jobs(self):
+        """Check submitted batches and deliver completed answers"""
+        if not self.openai_client:
+            return
+        
+        try:
+            jobs = await self.bot.db.ai_batch_jobs.find({"status": "pending"}).to_list(length=None)
+            
+            for job in jobs:
+                batch = await self.openai_client.batches.retrieve(job["batch_id"])
+                
+                if batch.status == "completed":
+                    await self.deliver_batch_results(job, batch.output_file_id)
+                elif batch.status in ("failed", "expired", "cancelled"):
+                    await self.notify_batch_failure(job["requests"])
+                else:
+                    continue
+                
+                await self.bot.db.ai_batch_jobs.update_one(
+                    {"_id": job["_id"]},
+                    {"$set": {"status": batch.status}}
+                )
+        except Exception as e:
+            logger.error(f"Error polling AI batches: {e}")
+    
+    @flush_batch_queue.before_loop
+    @poll_batch_jobs.before_loop
+    async def before_batch_loops(self):
+        """Wait until bot is ready"""
+        await self.bot.wait_until_ready()
+    
+    async def deliver_batch_results(self, job: dict, output_file_id: Optional[str]):
+        """Post the answers of a completed batch back to their channels"""
+        requests = {item["custom_id"]: item for item in job["requests"]}
+        if not output_file_id:
+            await self.notify_batch_failure(requests.values())
+            return
+        
+        output = await self.openai_client.files.content(output_file_id)
+        
+        for line in output.text.splitlines():
+            if not line.strip():
+                continue
+            
+            result = json.loads(line)
+            response = result.get("response") or {}
+            if response.get("status_code") != 200:
+                continue
+            
+            request = requests.pop(result.get("custom_id"), None)
+            if not request:
+                continue
+            
+            channel = self.bot.get_channel(request["channel_id"])
+            if not channel:
+                continue
             
-            # Create embed with the AI response
             embed = EmbedBuilder.create(
                 title="🤖 Nova AI Response",
-                description=ai_response,
+                description=response["body"]["choices"][0]["message"]["content"],
                 color=discord.Color.from_rgb(177, 156, 217)
             )
-            embed.add_field(name="Question", value=question, inline=False)
-            embed.set_footer(text=f"Asked by {interaction.user.display_name} | 🌸 Powered by Nova")
+            embed.add_field(name="Question", value=request["question"], inline=False)
             
-            await interaction.followup.send(embed=embed)
+            try:
+                await channel.send(content=f"<@{request['user_id']}>", embed=embed)
+            except discord.HTTPException as e:
+                logger.warning(f"Failed to deliver AI batch answer: {e}")
+        
+        # Whatever is left got no answer (a per-request error in the batch)
+        await self.notify_batch_failure(requests.values())
+    
+    async def notify_batch_failure(self, requests) -> None:
+        """Tell the askers of unanswered batch questions that their question failed"""
+        for request in requests:
+            channel = self.bot.get_channel(request["channel_id"])
+            if not channel:
+                continue
             
-        except Exception as e:
-            embed = EmbedBuilder.error(f"Failed to get AI response: {str(e)}")
-            await interaction.followup.send(embed=embed, ephemeral=True)
+            embed = EmbedBuilder.error(
+                "Sorry, I couldn't answer your queued question. Please try again with `/ask`."
+            )
+            embed.add_field(name="Question", value=request["question"], inline=False)
+            
+            try:
+                await channel.send(content=f"<@{request['user_id']}>", embed=embed)
+            except discord.HTTPException as e:
+                logger.warning(f"Failed to deliver AI batch failure notice: {e}")
     
     @app_commands.command(name="chat", description="💬 Toggle AI chat responses in this server")
     async def chat_toggle(self, interaction: discord.Interaction):
@@ -97,18 +508,15 @@ class AIChat(commands.Cog):
             await interaction.response.send_message(embed=embed, ephemeral=True)
             return
         
-        # Get current setting from database
-        guild_data = await self.bot.db.server_settings.find_one({"guild_id": interaction.guild.id})
-        current_setting = guild_data.get("ai_chat_enabled", False) if guild_data else False
-        
-        # Toggle the setting
-        new_setting = not current_setting
-        
-        await self.bot.db.server_settings.update_one(
+        # Flip the setting and read it back in one atomic round-trip
+        guild_data = await self.bot.db.server_settings.find_one_and_update(
             {"guild_id": interaction.guild.id},
-            {"$set": {"ai_chat_enabled": new_setting}},
-            upsert=True
+            [{"$set": {"ai_chat_enabled": {"$not": [{"$ifNull": ["$ai_chat_enabled", False]}]}}}],
+            upsert=True,
+            return_document=ReturnDocument.AFTER
         )
+        new_setting = guild_data["ai_chat_enabled"]
+        self._ai_enabled_cache[interaction.guild.id] = (new_setting, time.monotonic())
         
         status = "enabled" if new_setting else "disabled"
         embed = EmbedBuilder.success(f"AI chat responses have been **{status}** for this server!")
@@ -133,31 +541,34 @@ class AIChat(commands.Cog):
         if not message.guild:
             return
         
-        # Check if AI chat is enabled for this server
-        try:
-            guild_data = await self.bot.db.server_settings.find_one({"guild_id": message.guild.id})
-            if not guild_data or not guild_data.get("ai_chat_enabled", False):
-                return
-        except:
+        # Don't respond if no OpenAI client
+        if not self.openai_client:
             return
         
-        # Check if bot was mentioned or message starts with "nova"
+        # Check if bot was mentioned (including reply pings) or message starts with "nova"
         mentioned = self.bot.user in message.mentions
-        starts_with_nova = message.content.lower().startswith("nova")
+        starts_with_nova = message.content[:4].casefold() == "nova"
         
         if not (mentioned or starts_with_nova):
             return
         
-        # Don't respond if no OpenAI client
-        if not self.openai_client:
+        # Check if AI chat is enabled for this server
+        try:
+            if not await self._is_ai_enabled(message.guild.id):
+                return
+        except:
             return
         
         # Clean the message content
         content = message.content
-        if mentioned:
-            content = content.replace(f"<@{self.bot.user.id}>", "").strip()
         if starts_with_nova:
-            content = content[4:].strip()  # Remove "nova" prefix
+            content = content[4:]  # Remove "nova" prefix
+        if mentioned:
+            if not self._mention_strings:
+                self._mention_strings = (f"<@{self.bot.user.id}>", f"<@!{self.bot.user.id}>")
+            for mention in self._mention_strings:
+                content = content.replace(mention, "")
+        content = content.strip()
         
         if not content:
             return
@@ -176,7 +587,7 @@ class AIChat(commands.Cog):
                 Keep responses short (under 200 characters) since this is casual chat.
                 Use emojis occasionally but don't overdo it. You love helping and making friends! 🌸"""
                 
-                response = await self.openai_client.chat.completions.create(
+                response = await self._chat_create(
                     model="gpt-3.5-turbo",
                     messages=[
                         {"role": "system", "content": system_message},
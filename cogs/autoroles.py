@@ -3,20 +3,82 @@ Autoroles cog for Nova bot
 Provides automatic role assignment functionality.
 """
 
-from typing import List, Optional
+import asyncio
+import logging
+from typing import Dict, List, Optional, Set
 
 import discord
 from discord import app_commands
 from discord.ext import commands
+from pymongo.errors import DuplicateKeyError, PyMongoError
 
 from utils.embeds import EmbedBuilder
 
+logger = logging.getLogger(__name__)
+
+
+class ConfirmView(discord.ui.View):
+    """Confirmation prompt for clearing autoroles"""
+    
+    def __init__(self):
+        super().__init__(timeout=30)
+        self.confirmed = False
+    
+    @discord.ui.button(label="Confirm", style=discord.ButtonStyle.red)
+    async def confirm(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.confirmed = True
+        await interaction.response.defer()
+        self.stop()
+    
+    @discord.ui.button(label="Cancel", style=discord.ButtonStyle.secondary)
+    async def cancel(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await interaction.response.defer()
+        self.stop()
+
 
 class Autoroles(commands.Cog):
     """Automatic role assignment system"""
     
     def __init__(self, bot: commands.Bot):
         self.bot = bot
+        
+        # Per-guild cache of autorole IDs: guild_id -> [role_id, ...]
+        self._autoroles_cache: Dict[int, List[int]] = {}
+        
+        # Background purges of invalid autoroles, referenced until they finish
+        self._purge_tasks: Set[asyncio.Task] = set()
+    
+    async def _get_autoroles(self, guild_id: int) -> List[int]:
+        """Get the autorole IDs for a guild, using the in-process cache"""
+        if guild_id not in self._autoroles_cache:
+            autoroles = await self.bot.db.autoroles.find({"guild_id": guild_id}).to_list(length=None)
+            self._autoroles_cache[guild_id] = [autorole["role_id"] for autorole in autoroles]
+        
+        return self._autoroles_cache[guild_id]
+    
+    def _uncache_autorole(self, guild_id: int, role_id: int) -> None:
+        """Drop a role from the cached autoroles of a guild"""
+        cached = self._autoroles_cache.get(guild_id)
+        if cached and role_id in cached:
+            cached.remove(role_id)
+    
+    def _purge_autoroles(self, guild_id: int, role_ids: List[int]) -> None:
+        """Remove invalid autoroles from the cache now and from the database in the background"""
+        for role_id in role_ids:
+            self._uncache_autorole(guild_id, role_id)
+        
+        task = asyncio.create_task(self.bot.db.autoroles.delete_many({
+            "guild_id": guild_id,
+            "role_id": {"$in": role_ids}
+        }))
+        self._purge_tasks.add(task)
+        task.add_done_callback(self._purge_done)
+    
+    def _purge_done(self, task: asyncio.Task) -> None:
+        """Forget a finished purge and report it if it failed"""
+        self._purge_tasks.discard(task)
+        if not task.cancelled() and task.exception():
+            logger.error(f"Failed to purge invalid autoroles: {task.exception()}")
     
     @app_commands.command(name="autorole-add", description="➕ Add a role to be given to new members")
     @app_commands.describe(role="Role to automatically assign to new members")
@@ -42,23 +104,20 @@ class Autoroles(commands.Cog):
             await interaction.response.send_message(embed=embed, ephemeral=True)
             return
         
-        # Check if role is already an autorole
-        existing = await self.bot.db.autoroles.find_one({
-            "guild_id": interaction.guild.id,
-            "role_id": role.id
-        })
-        
-        if existing:
+        # Add to database (the unique index rejects duplicate autoroles)
+        try:
+            await self.bot.db.autoroles.insert_one({
+                "guild_id": interaction.guild.id,
+                "role_id": role.id,
+                "added_by": interaction.user.id
+            })
+        except DuplicateKeyError:
             embed = EmbedBuilder.error(f"{role.mention} is already an autorole!")
             await interaction.response.send_message(embed=embed, ephemeral=True)
             return
         
-        # Add to database
-        await self.bot.db.autoroles.insert_one({
-            "guild_id": interaction.guild.id,
-            "role_id": role.id,
-            "added_by": interaction.user.id
-        })
+        if interaction.guild.id in self._autoroles_cache:
+            self._autoroles_cache[interaction.guild.id].append(role.id)
         
         embed = EmbedBuilder.success(f"Added {role.mention} as an autorole!\nNew members will automatically receive this role.")
         await interaction.response.send_message(embed=embed)
@@ -83,15 +142,15 @@ class Autoroles(commands.Cog):
             await interaction.response.send_message(embed=embed, ephemeral=True)
             return
         
+        self._uncache_autorole(interaction.guild.id, role.id)
+        
         embed = EmbedBuilder.success(f"Removed {role.mention} from autoroles!")
         await interaction.response.send_message(embed=embed)
-
-@app_commands.command(name="autorole-list", description="📋 List all autoroles")
+    
+    @app_commands.command(name="autorole-list", description="📋 List all autoroles")
     async def autorole_list(self, interaction: discord.Interaction):
         """List all autoroles for the server"""
-        autoroles = await self.bot.db.autoroles.find({
-            "guild_id": interaction.guild.id
-        }).to_list(length=None)
+        autoroles = await self._get_autoroles(interaction.guild.id)
         
         if not autoroles:
             embed = EmbedBuilder.create(
@@ -110,15 +169,19 @@ class Autoroles(commands.Cog):
         
         role_list = ""
         valid_autoroles = []
+        invalid_ids = []
         
-        for autorole in autoroles:
-            role = interaction.guild.get_role(autorole["role_id"])
+        for role_id in autoroles:
+            role = interaction.guild.get_role(role_id)
             if role:
                 role_list += f"• {role.mention}\n"
-                valid_autoroles.append(autorole)
+                valid_autoroles.append(role_id)
             else:
-                # Clean up invalid autoroles
-                await self.bot.db.autoroles.delete_one({"_id": autorole["_id"]})
+                invalid_ids.append(role_id)
+        
+        # Clean up invalid autoroles
+        if invalid_ids:
+            self._purge_autoroles(interaction.guild.id, invalid_ids)
         
         if not valid_autoroles:
             embed.description = "No valid autoroles found!\nSome roles may have been deleted."
@@ -137,30 +200,13 @@ class Autoroles(commands.Cog):
             return
         
         # Count current autoroles
-        count = await self.bot.db.autoroles.count_documents({"guild_id": interaction.guild.id})
+        count = len(await self._get_autoroles(interaction.guild.id))
         
         if count == 0:
             embed = EmbedBuilder.error("There are no autoroles to clear!")
             await interaction.response.send_message(embed=embed, ephemeral=True)
             return
         
-        # Create confirmation view
-        class ConfirmView(discord.ui.View):
-            def __init__(self):
-                super().__init__(timeout=30)
-                self.confirmed = False
-            
-            @discord.ui.button(label="Confirm", style=discord.ButtonStyle.red)
-            async def confirm(self, interaction, button):
-                self.confirmed = True
-                await interaction.response.defer()
-                self.stop()
-            
-            @discord.ui.button(label="Cancel", style=discord.ButtonStyle.secondary)
-            async def cancel(self, interaction, button):
-                await interaction.response.defer()
-                self.stop()
-        
         embed = EmbedBuilder.create(
             title="🗑️ Clear Autoroles",
             description=f"Are you sure you want to remove all {count} autoroles?\nThis action cannot be undone!",
@@ -173,6 +219,7 @@ class Autoroles(commands.Cog):
         
         if view.confirmed:
             result = await self.bot.db.autoroles.delete_many({"guild_id": interaction.guild.id})
+            self._autoroles_cache[interaction.guild.id] = []
             embed = EmbedBuilder.success(f"Cleared {result.deleted_count} autoroles!")
         else:
             embed = EmbedBuilder.create(
@@ -188,21 +235,24 @@ class Autoroles(commands.Cog):
         """Assign autoroles to new members"""
         try:
             # Get autoroles for the guild
-            autoroles = await self.bot.db.autoroles.find({
-                "guild_id": member.guild.id
-            }).to_list(length=None)
+            autoroles = await self._get_autoroles(member.guild.id)
             
             if not autoroles:
                 return
             
             roles_to_add = []
-            for autorole in autoroles:
-                role = member.guild.get_role(autorole["role_id"])
-                if role and role < member.guild.me.top_role and not role.managed:
+            invalid_ids = []
+            bot_top_role = member.guild.me.top_role
+            for role_id in autoroles:
+                role = member.guild.get_role(role_id)
+                if role and role < bot_top_role and not role.managed:
                     roles_to_add.append(role)
                 else:
-                    # Clean up invalid autorole
-                    await self.bot.db.autoroles.delete_one({"_id": autorole["_id"]})
+                    invalid_ids.append(role_id)
+            
+            # Clean up invalid autoroles without delaying role assignment
+            if invalid_ids:
+                self._purge_autoroles(member.guild.id, invalid_ids)
             
             if roles_to_add:
                 await member.add_roles(*roles_to_add, reason="Autorole assignment")
@@ -224,11 +274,13 @@ class Autoroles(commands.Cog):
                             embed.timestamp = member.joined_at
                             
                             await log_channel.send(embed=embed)
-                except:
+                except (discord.HTTPException, PyMongoError):
                     pass  # Fail silently if logging fails
                     
-        except Exception as e:
-            print(f"Error in autorole assignment: {e}")
+        except discord.Forbidden:
+            logger.warning(f"Missing permissions to assign autoroles in guild {member.guild.id}")
+        except (discord.HTTPException, PyMongoError) as e:
+            logger.error(f"Error in autorole assignment: {e}")
 
 
 async def setup(bot: commands.Bot):
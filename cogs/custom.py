@@ -3,20 +3,245 @@ Custom tags cog for Nova bot
 Provides server-specific custom command functionality.
 """
 
-from typing import Optional
+import asyncio
+import logging
+import re
+import time
+from collections import OrderedDict, defaultdict
+from typing import Dict, List, Optional, Set, Tuple
 
 import discord
 from discord import app_commands
-from discord.ext import commands
+from discord.ext import commands, tasks
+from discord.utils import utcnow as _utcnow
+from pymongo import ReadPreference, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, PyMongoError
 
 from utils.embeds import EmbedBuilder
 
+logger = logging.getLogger(__name__)
+
+# Maximum number of tag documents kept in the in-process cache
+TAG_CACHE_SIZE = 4096
+
+# Server-side time limit for read-only tag queries, below Discord's 3s interaction window
+READ_TIMEOUT_MS = 2000
+
+# Valid (lowercased) tag names: 2-32 letters, numbers, hyphens or underscores
+TAG_NAME_PATTERN = re.compile(r"\A[a-z0-9_-]{2,32}\Z")
+
+# Error embeds with constant text, built once and reused
+CREATE_PERMISSION_ERROR = EmbedBuilder.error("You need Manage Messages permission to create tags!")
+INVALID_NAME_ERROR = EmbedBuilder.error(
+    "Tag name must be between 2 and 32 characters and can only contain "
+    "letters, numbers, hyphens, and underscores!"
+)
+CONTENT_TOO_LONG_ERROR = EmbedBuilder.error("Tag content cannot exceed 2000 characters!")
+WRITE_PERMISSION_ERRORS = {
+    action: EmbedBuilder.error(f"You can only {action} tags you created, or you need Manage Messages permission!")
+    for action in ("edit", "delete")
+}
+
+
+def to_epoch(value) -> int:
+    """Get epoch seconds from a stored timestamp (tags created before the int format hold datetimes)"""
+    return value if isinstance(value, int) else int(value.timestamp())
+
+
+def check_tag_input(name: str, content: Optional[str] = None) -> Optional[discord.Embed]:
+    """Bound user input before it reaches the database; returns an error embed if rejected"""
+    if len(name) > 32:
+        return INVALID_NAME_ERROR
+    
+    if content is not None and len(content) > 2000:
+        return CONTENT_TOO_LONG_ERROR
+    
+    return None
+
 
 class Custom(commands.Cog):
     """Custom tags and commands system"""
     
     def __init__(self, bot: commands.Bot):
         self.bot = bot
+        
+        # Read-only handle for listing/search queries, served by secondaries when available
+        self._tags_ro = bot.db.tags.with_options(read_preference=ReadPreference.SECONDARY_PREFERRED)
+        
+        # LRU cache of tag documents: (guild_id, name) -> (fetched_at, tag)
+        self._tag_cache: OrderedDict = OrderedDict()
+        self._tag_cache_ttl = 60.0
+        
+        # Per-guild caches of /tag-list and /tag-stats results: guild_id -> (fetched_at, result)
+        self._list_cache: Dict[int, Tuple[float, Tuple[int, List[dict]]]] = {}
+        self._stats_cache: Dict[int, Tuple[float, dict]] = {}
+        self._summary_cache_ttl = 30.0
+        
+        # Pending usage counter increments: tag _id -> count
+        self._use_increments = defaultdict(int)
+        self.flush_tag_uses.start()
+        
+        # Users who have authored a tag, per guild: guild_id -> {user_id, ...}
+        self._authors: Dict[int, Set[int]] = defaultdict(set)
+        self._authors_loaded = False
+    
+    async def cog_load(self):
+        """Load the tag author sets"""
+        try:
+            async for doc in self.bot.db.tags.aggregate([
+                {"$group": {"_id": "$guild_id", "authors": {"$addToSet": "$author_id"}}}
+            ]):
+                self._authors[doc["_id"]].update(doc["authors"])
+            self._authors_loaded = True
+        except Exception as e:
+            logger.error(f"Failed to load tag authors: {e}")
+    
+    def _is_known_non_author(self, interaction: discord.Interaction) -> bool:
+        """Check if a user without Manage Messages has never authored a tag in this guild"""
+        return (
+            self._authors_loaded and
+            not interaction.user.guild_permissions.manage_messages and
+            interaction.user.id not in self._authors[interaction.guild.id]
+        )
+    
+    async def cog_unload(self):
+        """Clean up when cog is unloaded"""
+        self.flush_tag_uses.cancel()
+        await self.flush_tag_uses()
+    
+    @tasks.loop(seconds=5)
+    async def flush_tag_uses(self):
+        """Write accumulated tag usage counts in a single bulk operation"""
+        if not self._use_increments:
+            return
+        
+        pending, self._use_increments = self._use_increments, defaultdict(int)
+        items = list(pending.items())
+        
+        try:
+            await self.bot.db.tags.bulk_write(
+                [UpdateOne({"_id": tag_id}, {"$inc": {"uses": count}}) for tag_id, count in items],
+                ordered=False
+            )
+        except BulkWriteError as e:
+            # The other updates were applied; keep only the failed ones for the next flush
+            failed = [items[error["index"]] for error in e.details.get("writeErrors", [])]
+            for tag_id, count in failed:
+                self._use_increments[tag_id] += count
+            logger.error(f"Failed to flush {len(failed)} tag use counts, retrying next flush: {e}")
+        except PyMongoError as e:
+            # Nothing was confirmed written; merge the counts back so they aren't lost
+            for tag_id, count in items:
+                self._use_increments[tag_id] += count
+            logger.error(f"Error flushing tag uses, retrying next flush: {e}")
+    
+    async def _get_tag(self, guild_id: int, name: str) -> Optional[dict]:
+        """Get a tag, using the in-process cache before falling back to the database"""
+        key = (guild_id, name)
+        cached = self._tag_cache.get(key)
+        
+        if cached and time.monotonic() - cached[0] < self._tag_cache_ttl:
+            self._tag_cache.move_to_end(key)
+            return cached[1]
+        
+        tag = await self.bot.db.tags.find_one(
+            {"guild_id": guild_id, "name": name},
+            {"_id": 1, "content": 1, "uses": 1, "author_id": 1}
+        )
+        
+        if tag:
+            self._tag_cache[key] = (time.monotonic(), tag)
+            self._tag_cache.move_to_end(key)
+            if len(self._tag_cache) > TAG_CACHE_SIZE:
+                self._tag_cache.popitem(last=False)
+        else:
+            self._tag_cache.pop(key, None)
+        
+        return tag
+    
+    def _invalidate_tag(self, guild_id: int, name: str) -> None:
+        """Drop a tag and its guild's list/stats results from the caches after it changes"""
+        self._tag_cache.pop((guild_id, name), None)
+        self._list_cache.pop(guild_id, None)
+        self._stats_cache.pop(guild_id, None)
+    
+    async def _resolve_names(self, guild: discord.Guild, user_ids) -> Dict[int, str]:
+        """Resolve display names for a set of users with one gateway query for uncached members"""
+        names = {}
+        missing = []
+        
+        for user_id in set(user_ids):
+            member = guild.get_member(user_id)
+            if member:
+                names[user_id] = member.display_name
+            else:
+                missing.append(user_id)
+        
+        if missing:
+            try:
+                members = await guild.query_members(user_ids=missing[:100], limit=100)
+                names.update({member.id: member.display_name for member in members})
+            except (asyncio.TimeoutError, discord.ClientException):
+                pass
+        
+        return names
+    
+    async def _get_tag_list(self, guild_id: int) -> Tuple[int, List[dict]]:
+        """Get the tag count and the 15 most used tags of a guild, cached for a short time"""
+        cached = self._list_cache.get(guild_id)
+        if cached and time.monotonic() - cached[0] < self._summary_cache_ttl:
+            return cached[1]
+        
+        total, tags = await asyncio.gather(
+            self._tags_ro.count_documents({"guild_id": guild_id}, maxTimeMS=READ_TIMEOUT_MS),
+            self._tags_ro.find(
+                {"guild_id": guild_id},
+                {"name": 1, "uses": 1, "author_id": 1}
+            ).sort("uses", -1).limit(15).max_time_ms(READ_TIMEOUT_MS).to_list(length=15)
+        )
+        
+        self._list_cache[guild_id] = (time.monotonic(), (total, tags))
+        return total, tags
+    
+    async def _get_tag_stats(self, guild_id: int) -> dict:
+        """Get totals, top authors and most used tags of a guild, cached for a short time"""
+        cached = self._stats_cache.get(guild_id)
+        if cached and time.monotonic() - cached[0] < self._summary_cache_ttl:
+            return cached[1]
+        
+        # Totals, top authors and most used tags in a single round trip
+        pipeline = [
+            {"$match": {"guild_id": guild_id}},
+            {"$facet": {
+                "totals": [
+                    {"$group": {
+                        "_id": None,
+                        "total_tags": {"$sum": 1},
+                        "total_uses": {"$sum": "$uses"},
+                        "avg_uses": {"$avg": "$uses"}
+                    }}
+                ],
+                "authors": [
+                    {"$group": {
+                        "_id": "$author_id",
+                        "tag_count": {"$sum": 1},
+                        "total_uses": {"$sum": "$uses"}
+                    }},
+                    {"$sort": {"tag_count": -1}},
+                    {"$limit": 5}
+                ],
+                "top": [
+                    {"$match": {"uses": {"$gt": 0}}},
+                    {"$sort": {"uses": -1}},
+                    {"$limit": 5},
+                    {"$project": {"name": 1, "uses": 1}}
+                ]
+            }}
+        ]
+        
+        stats = (await self._tags_ro.aggregate(pipeline, maxTimeMS=READ_TIMEOUT_MS).to_list(length=1))[0]
+        self._stats_cache[guild_id] = (time.monotonic(), stats)
+        return stats
     
     @app_commands.command(name="tag-create", description="🏷️ Create a custom tag")
     @app_commands.describe(
@@ -25,80 +250,75 @@ class Custom(commands.Cog):
     )
     async def tag_create(self, interaction: discord.Interaction, name: str, content: str):
         """Create a custom tag"""
-        if not interaction.user.guild_permissions.manage_messages:
-            embed = EmbedBuilder.error("You need Manage Messages permission to create tags!")
-            await interaction.response.send_message(embed=embed, ephemeral=True)
+        guild_id = interaction.guild.id
+        user_id = interaction.user.id
+        manage_messages = interaction.user.guild_permissions.manage_messages
+        send = interaction.response.send_message
+        
+        error = check_tag_input(name, content)
+        if error:
+            await send(embed=error, ephemeral=True)
             return
         
-        # Validate tag name
-        name = name.lower()
-        if len(name) < 2 or len(name) > 32:
-            embed = EmbedBuilder.error("Tag name must be between 2 and 32 characters!")
-            await interaction.response.send_message(embed=embed, ephemeral=True)
+        if not manage_messages:
+            await send(embed=CREATE_PERMISSION_ERROR, ephemeral=True)
             return
         
-        # Check for invalid characters
-        if not name.isalnum() and not all(c in '-_' for c in name if not c.isalnum()):
-            embed = EmbedBuilder.error("Tag name can only contain letters, numbers, hyphens, and underscores!")
-            await interaction.response.send_message(embed=embed, ephemeral=True)
+        # Validate tag name
+        name = name.lower()
+        if not TAG_NAME_PATTERN.match(name):
+            await send(embed=INVALID_NAME_ERROR, ephemeral=True)
             return
         
-        # Check if tag already exists
-        existing_tag = await self.bot.db.tags.find_one({
-            "guild_id": interaction.guild.id,
-            "name": name
-        })
-        
-        if existing_tag:
+        # Create tag (the unique index rejects duplicate names)
+        try:
+            await self.bot.db.tags.insert_one({
+                "guild_id": guild_id,
+                "name": name,
+                "content": content,
+                "author_id": user_id,
+                "created_at": int(_utcnow().timestamp()),
+                "uses": 0
+            })
+        except DuplicateKeyError:
             embed = EmbedBuilder.error(f"Tag `{name}` already exists!")
-            await interaction.response.send_message(embed=embed, ephemeral=True)
-            return
-        
-        # Validate content
-        if len(content) > 2000:
-            embed = EmbedBuilder.error("Tag content cannot exceed 2000 characters!")
-            await interaction.response.send_message(embed=embed, ephemeral=True)
+            await send(embed=embed, ephemeral=True)
             return
         
-        # Create tag
-        await self.bot.db.tags.insert_one({
-            "guild_id": interaction.guild.id,
-            "name": name,
-            "content": content,
-            "author_id": interaction.user.id,
-            "created_at": discord.utils.utcnow(),
-            "uses": 0
-        })
+        self._invalidate_tag(guild_id, name)
+        self._authors[guild_id].add(user_id)
         
         embed = EmbedBuilder.success(f"Tag `{name}` created successfully!")
         embed.add_field(name="Usage", value=f"`/tag {name}`", inline=False)
         
-        await interaction.response.send_message(embed=embed)
+        await send(embed=embed)
     
     @app_commands.command(name="tag", description="🏷️ Use a custom tag")
     @app_commands.describe(name="Name of the tag to display")
     async def tag_use(self, interaction: discord.Interaction, name: str):
         """Use a custom tag"""
+        guild_id = interaction.guild.id
+        send = interaction.response.send_message
+        
+        error = check_tag_input(name)
+        if error:
+            await send(embed=error, ephemeral=True)
+            return
+        
         name = name.lower()
         
-        tag = await self.bot.db.tags.find_one({
-            "guild_id": interaction.guild.id,
-            "name": name
-        })
+        tag = await self._get_tag(guild_id, name)
         
         if not tag:
             embed = EmbedBuilder.error(f"Tag `{name}` not found!")
-            await interaction.response.send_message(embed=embed, ephemeral=True)
+            await send(embed=embed, ephemeral=True)
             return
         
-        # Increment usage counter
-        await self.bot.db.tags.update_one(
-            {"_id": tag["_id"]},
-            {"$inc": {"uses": 1}}
-        )
-        
         # Send tag content
-        await interaction.response.send_message(tag["content"])
+        await send(tag["content"])
+        
+        # Increment usage counter (written in batches by flush_tag_uses)
+        self._use_increments[tag["_id"]] += 1
     
     @app_commands.command(name="tag-edit", description="✏️ Edit a custom tag")
     @app_commands.describe(
@@ -107,97 +327,121 @@ class Custom(commands.Cog):
     )
     async def tag_edit(self, interaction: discord.Interaction, name: str, content: str):
         """Edit a custom tag"""
-        name = name.lower()
-        
-        tag = await self.bot.db.tags.find_one({
-            "guild_id": interaction.guild.id,
-            "name": name
-        })
-        
-        if not tag:
-            embed = EmbedBuilder.error(f"Tag `{name}` not found!")
-            await interaction.response.send_message(embed=embed, ephemeral=True)
+        guild_id = interaction.guild.id
+        user_id = interaction.user.id
+        manage_messages = interaction.user.guild_permissions.manage_messages
+        send = interaction.response.send_message
+        
+        error = check_tag_input(name, content)
+        if error:
+            await send(embed=error, ephemeral=True)
             return
         
-        # Check permissions
-        can_edit = (
-            interaction.user.id == tag["author_id"] or
-            interaction.user.guild_permissions.manage_messages
-        )
+        name = name.lower()
         
-        if not can_edit:
-            embed = EmbedBuilder.error("You can only edit tags you created, or you need Manage Messages permission!")
-            await interaction.response.send_message(embed=embed, ephemeral=True)
+        if self._is_known_non_author(interaction):
+            await send(embed=WRITE_PERMISSION_ERRORS["edit"], ephemeral=True)
             return
         
-        # Validate new content
-        if len(content) > 2000:
-            embed = EmbedBuilder.error("Tag content cannot exceed 2000 characters!")
-            await interaction.response.send_message(embed=embed, ephemeral=True)
-            return
+        # Update tag, restricted to the author unless the user can manage messages
+        tag_filter = {"guild_id": guild_id, "name": name}
+        if not manage_messages:
+            tag_filter["author_id"] = user_id
         
-        # Update tag
-        await self.bot.db.tags.update_one(
-            {"_id": tag["_id"]},
+        tag = await self.bot.db.tags.find_one_and_update(
+            tag_filter,
             {
                 "$set": {
                     "content": content,
-                    "edited_at": discord.utils.utcnow(),
-                    "edited_by": interaction.user.id
+                    "edited_at": int(_utcnow().timestamp()),
+                    "edited_by": user_id
                 }
-            }
+            },
+            projection={"_id": 1}
         )
         
+        if not tag:
+            embed = await self._tag_write_error(interaction, name, "edit")
+            await send(embed=embed, ephemeral=True)
+            return
+        
+        self._invalidate_tag(guild_id, name)
+        
         embed = EmbedBuilder.success(f"Tag `{name}` updated successfully!")
-        await interaction.response.send_message(embed=embed)
+        await send(embed=embed)
     
     @app_commands.command(name="tag-delete", description="🗑️ Delete a custom tag")
     @app_commands.describe(name="Name of the tag to delete")
     async def tag_delete(self, interaction: discord.Interaction, name: str):
         """Delete a custom tag"""
-        name = name.lower()
+        guild_id = interaction.guild.id
+        user_id = interaction.user.id
+        manage_messages = interaction.user.guild_permissions.manage_messages
+        send = interaction.response.send_message
+        
+        error = check_tag_input(name)
+        if error:
+            await send(embed=error, ephemeral=True)
+            return
         
-        tag = await self.bot.db.tags.find_one({
-            "guild_id": interaction.guild.id,
-            "name": name
-        })
+        name = name.lower()
         
-        if not tag:
-            embed = EmbedBuilder.error(f"Tag `{name}` not found!")
-            await interaction.response.send_message(embed=embed, ephemeral=True)
+        if self._is_known_non_author(interaction):
+            await send(embed=WRITE_PERMISSION_ERRORS["delete"], ephemeral=True)
             return
         
-        # Check permissions
-        can_delete = (
-            interaction.user.id == tag["author_id"] or
-            interaction.user.guild_permissions.manage_messages
-        )
+        # Delete tag, restricted to the author unless the user can manage messages
+        tag_filter = {"guild_id": guild_id, "name": name}
+        if not manage_messages:
+            tag_filter["author_id"] = user_id
+        
+        tag = await self.bot.db.tags.find_one_and_delete(tag_filter, projection={"_id": 1})
         
-        if not can_delete:
-            embed = EmbedBuilder.error("You can only delete tags you created, or you need Manage Messages permission!")
-            await interaction.response.send_message(embed=embed, ephemeral=True)
+        if not tag:
+            embed = await self._tag_write_error(interaction, name, "delete")
+            await send(embed=embed, ephemeral=True)
             return
         
-        # Delete tag
-        await self.bot.db.tags.delete_one({"_id": tag["_id"]})
+        self._invalidate_tag(guild_id, name)
         
         embed = EmbedBuilder.success(f"Tag `{name}` deleted successfully!")
-        await interaction.response.send_message(embed=embed)
+        await send(embed=embed)
+    
+    async def _tag_write_error(self, interaction: discord.Interaction, name: str, action: str) -> discord.Embed:
+        """Explain why a conditional edit/delete matched nothing: missing tag or missing permission"""
+        exists = await self.bot.db.tags.find_one(
+            {"guild_id": interaction.guild.id, "name": name},
+            {"_id": 1}
+        )
+        
+        if not exists:
+            return EmbedBuilder.error(f"Tag `{name}` not found!")
+        
+        return WRITE_PERMISSION_ERRORS[action]
     
     @app_commands.command(name="tag-info", description="ℹ️ Get information about a tag")
     @app_commands.describe(name="Name of the tag to get info about")
     async def tag_info(self, interaction: discord.Interaction, name: str):
         """Get information about a tag"""
+        guild_id = interaction.guild.id
+        send = interaction.response.send_message
+        
+        error = check_tag_input(name)
+        if error:
+            await send(embed=error, ephemeral=True)
+            return
+        
         name = name.lower()
         
-        tag = await self.bot.db.tags.find_one({
-            "guild_id": interaction.guild.id,
-            "name": name
-        })
+        # Primary read, so a tag created moments ago is always found
+        tag = await self.bot.db.tags.find_one(
+            {"guild_id": guild_id, "name": name},
+            max_time_ms=READ_TIMEOUT_MS
+        )
         
         if not tag:
             embed = EmbedBuilder.error(f"Tag `{name}` not found!")
-            await interaction.response.send_message(embed=embed, ephemeral=True)
+            await send(embed=embed, ephemeral=True)
             return
         
         embed = EmbedBuilder.create(
@@ -211,27 +455,25 @@ class Custom(commands.Cog):
         
         embed.add_field(name="Author", value=author_name, inline=True)
         embed.add_field(name="Uses", value=str(tag["uses"]), inline=True)
-        embed.add_field(name="Created", value=f"<t:{int(tag['created_at'].timestamp())}:R>", inline=True)
+        embed.add_field(name="Created", value=f"<t:{to_epoch(tag['created_at'])}:R>", inline=True)
         
         if "edited_at" in tag:
             editor = self.bot.get_user(tag["edited_by"]) if "edited_by" in tag else None
             editor_name = editor.display_name if editor else "Unknown User"
-            embed.add_field(name="Last Edited", value=f"<t:{int(tag['edited_at'].timestamp())}:R> by {editor_name}", inline=False)
+            embed.add_field(name="Last Edited", value=f"<t:{to_epoch(tag['edited_at'])}:R> by {editor_name}", inline=False)
         
         # Show content preview
         content_preview = tag["content"][:200] + "..." if len(tag["content"]) > 200 else tag["content"]
         embed.add_field(name="Content Preview", value=f"```{content_preview}```", inline=False)
         
-        await interaction.response.send_message(embed=embed)
+        await send(embed=embed)
     
     @app_commands.command(name="tag-list", description="📋 List all tags in this server")
     async def tag_list(self, interaction: discord.Interaction):
         """List all tags in the server"""
         await interaction.response.defer()
         
-        tags = await self.bot.db.tags.find({
-            "guild_id": interaction.guild.id
-        }).sort("uses", -1).to_list(length=None)
+        total, tags = await self._get_tag_list(interaction.guild.id)
         
         if not tags:
             embed = EmbedBuilder.create(
@@ -244,30 +486,28 @@ class Custom(commands.Cog):
         
         embed = EmbedBuilder.create(
           title="📋 Server Tags",
-            description=f"Found {len(tags)} tag{'s' if len(tags) != 1 else ''} in this server",
+            description=f"Found {total} tag{'s' if total != 1 else ''} in this server",
             color=discord.Color.blue()
         )
         
         # Group tags by usage for better display
         popular_tags = [tag for tag in tags if tag["uses"] > 5][:10]
-        recent_tags = tags[:15]  # Show up to 15 most used tags
+        recent_tags = tags  # Up to 15 most used tags
         
         if popular_tags:
-            popular_text = ""
-            for tag in popular_tags:
-                author = self.bot.get_user(tag["author_id"])
-                author_name = author.display_name if author else "Unknown"
-                popular_text += f"• `{tag['name']}` ({tag['uses']} uses) - by {author_name}\n"
+            names = await self._resolve_names(interaction.guild, (tag["author_id"] for tag in popular_tags))
+            
+            popular_text = "\n".join(
+                f"• `{tag['name']}` ({tag['uses']} uses) - by {names.get(tag['author_id'], 'Unknown')}"
+                for tag in popular_tags
+            )
             
             embed.add_field(name="🔥 Popular Tags", value=popular_text, inline=False)
         
         # Show all tags (or first 15)
-        tag_list = ""
-        for i, tag in enumerate(recent_tags):
-            if i >= 15:
-                tag_list += f"... and {len(tags) - 15} more"
-                break
-            tag_list += f"`{tag['name']}` "
+        tag_list = " ".join(f"`{tag['name']}`" for tag in recent_tags)
+        if total > len(recent_tags):
+            tag_list += f" ... and {total - len(recent_tags)} more"
         
         if tag_list:
             embed.add_field(name="All Tags", value=tag_list, inline=False)
@@ -282,14 +522,25 @@ class Custom(commands.Cog):
         """Search for tags by name or content"""
         await interaction.response.defer()
         
-        # Search in both name and content
-        tags = await self.bot.db.tags.find({
-            "guild_id": interaction.guild.id,
-            "$or": [
-                {"name": {"$regex": query, "$options": "i"}},
-                {"content": {"$regex": query, "$options": "i"}}
-            ]
-        }).to_list(length=20)  # Limit to 20 results
+        # Search in both name and content using the text index
+        if any(c.isalnum() for c in query):
+            tags = await self._tags_ro.find(
+                {"guild_id": interaction.guild.id, "$text": {"$search": query}},
+                {"score": {"$meta": "textScore"}, "name": 1, "uses": 1, "author_id": 1}
+            ).sort([("score", {"$meta": "textScore"})]).max_time_ms(READ_TIMEOUT_MS).to_list(length=20)  # Limit to 20 results
+        else:
+            # Text search drops punctuation, so match punctuation-only queries literally
+            pattern = re.escape(query)
+            tags = await self._tags_ro.find(
+                {
+                    "guild_id": interaction.guild.id,
+                    "$or": [
+                        {"name": {"$regex": pattern}},
+                        {"content": {"$regex": pattern}}
+                    ]
+                },
+                {"name": 1, "uses": 1, "author_id": 1}
+            ).max_time_ms(READ_TIMEOUT_MS).to_list(length=20)
         
         if not tags:
             embed = EmbedBuilder.error(f"No tags found matching '{query}'")
@@ -302,14 +553,17 @@ class Custom(commands.Cog):
             color=discord.Color.blue()
         )
         
-        results_text = ""
-        for tag in tags[:10]:  # Show top 10
-            author = self.bot.get_user(tag["author_id"])
-            author_name = author.display_name if author else "Unknown"
-            results_text += f"• `{tag['name']}` ({tag['uses']} uses) - by {author_name}\n"
+        names = await self._resolve_names(interaction.guild, (tag["author_id"] for tag in tags[:10]))
+        
+        results = [
+            f"• `{tag['name']}` ({tag['uses']} uses) - by {names.get(tag['author_id'], 'Unknown')}"
+            for tag in tags[:10]  # Show top 10
+        ]
         
         if len(tags) > 10:
-            results_text += f"... and {len(tags) - 10} more results"
+            results.append(f"... and {len(tags) - 10} more results")
+        
+        results_text = "\n".join(results)
         
         embed.add_field(name="Results", value=results_text, inline=False)
         
@@ -320,71 +574,42 @@ class Custom(commands.Cog):
         """Show tag statistics"""
         await interaction.response.defer()
         
-        # Get tag statistics
-        pipeline = [
-            {"$match": {"guild_id": interaction.guild.id}},
-            {"$group": {
-                "_id": None,
-                "total_tags": {"$sum": 1},
-                "total_uses": {"$sum": "$uses"},
-                "avg_uses": {"$avg": "$uses"}
-            }}
-        ]
-        
-        stats = await self.bot.db.tags.aggregate(pipeline).to_list(length=1)
+        stats = await self._get_tag_stats(interaction.guild.id)
         
-        if not stats:
+        if not stats["totals"]:
             embed = EmbedBuilder.error("No tag statistics available!")
             await interaction.followup.send(embed=embed, ephemeral=True)
             return
         
-        stats = stats[0]
+        totals = stats["totals"][0]
         
         embed = EmbedBuilder.create(
             title="📊 Tag Statistics",
             color=discord.Color.from_rgb(135, 206, 235)
         )
         
-        embed.add_field(name="Total Tags", value=str(stats["total_tags"]), inline=True)
-        embed.add_field(name="Total Uses", value=f"{stats['total_uses']:,}", inline=True)
-        embed.add_field(name="Average Uses", value=f"{stats['avg_uses']:.1f}", inline=True)
-        
-        # Get top authors
-        author_pipeline = [
-            {"$match": {"guild_id": interaction.guild.id}},
-            {"$group": {
-                "_id": "$author_id",
-                "tag_count": {"$sum": 1},
-                "total_uses": {"$sum": "$uses"}
-            }},
-            {"$sort": {"tag_count": -1}},
-            {"$limit": 5}
-        ]
+        embed.add_field(name="Total Tags", value=str(totals["total_tags"]), inline=True)
+        embed.add_field(name="Total Uses", value=f"{totals['total_uses']:,}", inline=True)
+        embed.add_field(name="Average Uses", value=f"{totals['avg_uses']:.1f}", inline=True)
         
-        top_authors = await self.bot.db.tags.aggregate(author_pipeline).to_list(length=5)
+        top_authors = stats["authors"]
         
         if top_authors:
-            author_text = ""
-            for author_data in top_authors:
-                author = self.bot.get_user(author_data["_id"])
-                author_name = author.display_name if author else "Unknown User"
-                author_text += f"• {author_name}: {author_data['tag_count']} tags ({author_data['total_uses']} uses)\n"
+            names = await self._resolve_names(interaction.guild, (author_data["_id"] for author_data in top_authors))
+            
+            author_text = "\n".join(
+                f"• {names.get(author_data['_id'], 'Unknown User')}: "
+                f"{author_data['tag_count']} tags ({author_data['total_uses']} uses)"
+                for author_data in top_authors
+            )
             
             embed.add_field(name="🏆 Top Tag Creators", value=author_text, inline=False)
         
-        # Get most used tags
-        most_used = await self.bot.db.tags.find({
-            "guild_id": interaction.guild.id
-        }).sort("uses", -1).limit(5).to_list(length=5)
+        most_used = stats["top"]
         
         if most_used:
-            used_text = ""
-            for tag in most_used:
-                if tag["uses"] > 0:
-                    used_text += f"• `{tag['name']}`: {tag['uses']} uses\n"
-            
-            if used_text:
-                embed.add_field(name="📈 Most Used Tags", value=used_text, inline=False)
+            used_text = "\n".join(f"• `{tag['name']}`: {tag['uses']} uses" for tag in most_used)
+            embed.add_field(name="📈 Most Used Tags", value=used_text, inline=False)
         
         await interaction.followup.send(embed=embed)
     
@@ -395,18 +620,36 @@ class Custom(commands.Cog):
     @tag_info.autocomplete('name')
     async def tag_name_autocomplete(self, interaction: discord.Interaction, current: str):
         """Autocomplete tag names"""
+        guild_id = interaction.guild.id
+        
+        # Discord asks with empty input as soon as the option is focused; answer
+        # from the /tag-list cache when possible, even if it's a little stale
+        if not current:
+            cached = self._list_cache.get(guild_id)
+            if cached:
+                return [
+                    app_commands.Choice(name=tag["name"], value=tag["name"])
+                    for tag in cached[1][1]
+                ]
+        
         try:
+            current = current.lower()
+            
             # Get matching tags
-            tags = await self.bot.db.tags.find({
-                "guild_id": interaction.guild.id,
-                "name": {"$regex": f"^{current}", "$options": "i"}
-            }).sort("uses", -1).limit(25).to_list(length=25)
+            tags = await self._tags_ro.find(
+                {
+                    "guild_id": guild_id,
+                    # Names are stored lowercase, so a prefix range scans the index directly
+                    "name": {"$gte": current, "$lt": current + "\uffff"}
+                },
+                {"name": 1, "_id": 0}
+            ).sort("uses", -1).limit(25).max_time_ms(READ_TIMEOUT_MS).to_list(length=25)
             
             return [
                 app_commands.Choice(name=tag["name"], value=tag["name"])
                 for tag in tags
             ]
-        except:
+        except (PyMongoError, asyncio.TimeoutError):
             return []
 
 
@@ -5,64 +5,195 @@ Provides virtual currency system commands.
 
 import asyncio
 import random
-from datetime import datetime, timedelta
-from typing import Optional
+import time
+from bisect import bisect_right
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
 
 import discord
 from discord import app_commands
 from discord.ext import commands
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 
 from utils.embeds import EmbedBuilder
 
+# Embed colors, created once
+ECONOMY_COLOR = discord.Color.from_rgb(240, 230, 140)
+WORK_COLOR = discord.Color.from_rgb(144, 238, 144)
+WIN_COLOR = discord.Color.green()
+LOSS_COLOR = discord.Color.red()
+GIFT_COLOR = discord.Color.from_rgb(255, 182, 193)
+LEADERBOARD_COLOR = discord.Color.from_rgb(255, 215, 0)
+
+# Footer used by EmbedBuilder, for embeds built straight from dicts
+EMBED_FOOTER = {"text": "🌸 Powered by Nova"}
+
+# Maximum number of balances kept in the in-process cache
+BALANCE_CACHE_SIZE = 10000
+
+# One day in milliseconds, for date arithmetic in update pipelines
+DAY_MS = 24 * 60 * 60 * 1000
+
+# Error embeds with constant text, built once and reused
+MIN_BET_ERROR = EmbedBuilder.error("Minimum bet is 10 coins!")
+MAX_BET_ERROR = EmbedBuilder.error("Maximum bet is 10,000 coins!")
+SELF_GIVE_ERROR = EmbedBuilder.error("You can't give coins to yourself!")
+BOT_GIVE_ERROR = EmbedBuilder.error("You can't give coins to bots!")
+MIN_GIVE_ERROR = EmbedBuilder.error("You must give at least 1 coin!")
+
+# Wealth tiers for /balance: WEALTH_TIERS[i] applies from WEALTH_TIER_THRESHOLDS[i - 1] coins
+WEALTH_TIER_THRESHOLDS = (10000, 25000, 50000, 100000)
+WEALTH_TIERS = ("🌱 Starter", "🥉 Bronze Tier", "🥈 Silver Tier", "🏆 Gold Tier", "💎 Diamond Tier")
+
+# /gamble wins when a 32-bit draw falls below this (45% of the range)
+GAMBLE_WIN_THRESHOLD = int(0.45 * (1 << 32))
+
+# Work scenarios: (description, min earnings, max earnings)
+JOBS = (
+    ("You delivered packages for Nova Express", 100, 250),
+    ("You helped at the local café", 80, 200),
+    ("You walked dogs in the park", 60, 150),
+    ("You did freelance coding", 150, 300),
+    ("You tutored someone in Discord", 90, 180),
+    ("You cleaned windows downtown", 70, 160),
+    ("You helped an elderly neighbor", 50, 120),
+    ("You organized a local event", 200, 400),
+)
+
+# Placeholder shop items
+SHOP_ITEMS = (
+    {"name": "🌟 VIP Role", "price": 50000, "description": "Get a special VIP role!"},
+    {"name": "🎨 Custom Color", "price": 25000, "description": "Choose your role color!"},
+    {"name": "💝 Gift Box", "price": 10000, "description": "Random rewards inside!"},
+    {"name": "🏆 Trophy", "price": 15000, "description": "Show off your wealth!"},
+    {"name": "🌸 Nova Badge", "price": 5000, "description": "Cute Nova badge for your profile!"},
+)
+
+
+def build_shop_embed() -> discord.Embed:
+    """Build the /shop embed (the shop is static, so this runs once at import)"""
+    embed = EmbedBuilder.create(
+        title="🛒 Nova Shop",
+        description="Welcome to the Nova Shop! (Coming Soon)",
+        color=ECONOMY_COLOR
+    )
+    
+    shop_text = "".join(
+        f"**{item['name']}** - {item['price']:,} coins\n{item['description']}\n\n"
+        for item in SHOP_ITEMS
+    )
+    
+    embed.add_field(name="Available Items", value=shop_text, inline=False)
+    embed.add_field(
+        name="Note", 
+        value="Shop functionality is coming soon! Items will be purchasable in a future update.", 
+        inline=False
+    )
+    
+    return embed
+
+
+SHOP_EMBED = build_shop_embed()
+
+
+def as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Make a stored timestamp timezone-aware (the driver returns naive UTC datetimes)"""
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
 
 class Economy(commands.Cog):
     """Virtual economy system with currency and shops"""
     
     def __init__(self, bot: commands.Bot):
         self.bot = bot
+        
+        # LRU cache of balances: (guild_id, user_id) -> (fetched_at, balance)
+        self._balance_cache: OrderedDict = OrderedDict()
+        self._balance_cache_ttl = 5.0
     
-    async def get_user_balance(self, user_id: int, guild_id: int) -> int:
-        """Get user's current balance"""
-        user_data = await self.bot.db.economy.find_one({
-            "user_id": user_id,
-            "guild_id": guild_id
-        })
-        return user_data.get("balance", 0) if user_data else 0
+    def _cache_balance(self, user_id: int, guild_id: int, balance: int) -> None:
+        """Store a user's latest known balance in the in-process cache"""
+        key = (guild_id, user_id)
+        self._balance_cache[key] = (time.monotonic(), balance)
+        self._balance_cache.move_to_end(key)
+        if len(self._balance_cache) > BALANCE_CACHE_SIZE:
+            self._balance_cache.popitem(last=False)
     
-    async def update_balance(self, user_id: int, guild_id: int, amount: int) -> int:
-        """Update user's balance and return new balance"""
-        result = await self.bot.db.economy.find_one_and_update(
+    async def get_user_balance(self, user_id: int, guild_id: int) -> int:
+        """Get user's current balance, using the in-process cache before falling back to the database"""
+        cached = self._balance_cache.get((guild_id, user_id))
+        if cached and time.monotonic() - cached[0] < self._balance_cache_ttl:
+            self._balance_cache.move_to_end((guild_id, user_id))
+            return cached[1]
+        
+        user_data = await self.bot.db.economy.find_one(
             {"user_id": user_id, "guild_id": guild_id},
-            {"$inc": {"balance": amount}},
-            upsert=True,
-            return_document=True
+            {"balance": 1, "_id": 0}
         )
-        return result["balance"]
+        balance = user_data.get("balance", 0) if user_data else 0
+        self._cache_balance(user_id, guild_id, balance)
+        return balance
     
-    async def can_daily(self, user_id: int, guild_id: int) -> bool:
-        """Check if user can claim daily reward"""
-        user_data = await self.bot.db.economy.find_one({
-            "user_id": user_id,
-            "guild_id": guild_id
-        })
-        
-        if not user_data or "last_daily" not in user_data:
-            return True
-        
-        last_daily = user_data["last_daily"]
-        next_daily = last_daily + timedelta(hours=24)
-        return datetime.utcnow() >= next_daily
+    async def claim_cooldown_reward(
+        self,
+        user_id: int,
+        guild_id: int,
+        field: str,
+        cooldown: timedelta,
+        update: list,
+        first_claim: dict,
+        projection: dict
+    ) -> Tuple[Optional[dict], Optional[datetime]]:
+        """Apply a cooldown-gated reward; returns the updated wallet, or when the cooldown ends"""
+        query = {"user_id": user_id, "guild_id": guild_id}
+        
+        while True:
+            # Only matches an existing wallet whose cooldown has passed, so a miss never writes
+            wallet = await self.bot.db.economy.find_one_and_update(
+                {
+                    **query,
+                    "$or": [
+                        {field: {"$exists": False}},
+                        {field: {"$lte": datetime.now(timezone.utc) - cooldown}}
+                    ]
+                },
+                update,
+                projection=projection,
+                return_document=ReturnDocument.AFTER
+            )
+            if wallet:
+                return wallet, None
+            
+            current = await self.bot.db.economy.find_one(query, {field: 1, "_id": 0})
+            if current is None:
+                # First claim: create the wallet with the reward already applied
+                try:
+                    await self.bot.db.economy.insert_one({**query, **first_claim})
+                except DuplicateKeyError:
+                    continue  # The wallet was created meanwhile; claim against it
+                return {key: first_claim[key] for key in projection if key in first_claim}, None
+            
+            if field in current:
+                ready_at = as_utc(current[field]) + cooldown
+                if ready_at > datetime.now(timezone.utc):
+                    return None, ready_at
+            # Otherwise the wallet changed between the two reads; try the claim again
     
     @app_commands.command(name="balance", description="💰 Check your or someone's balance")
     @app_commands.describe(user="User to check balance for (optional)")
     async def balance(self, interaction: discord.Interaction, user: Optional[discord.Member] = None):
         """Check balance"""
         target = user if user else interaction.user
-        balance = await self.get_user_balance(target.id, interaction.guild.id)
+        # Bots can't earn or receive coins, so there is nothing to look up
+        balance = 0 if target.bot else await self.get_user_balance(target.id, interaction.guild.id)
         
         embed = EmbedBuilder.create(
             title="💰 Balance",
-            color=discord.Color.from_rgb(240, 230, 140)
+            color=ECONOMY_COLOR
         )
         
         if target == interaction.user:
@@ -71,16 +202,7 @@ class Economy(commands.Cog):
             embed.description = f"{target.display_name} has **{balance:,}** Nova Coins! 🪙"
         
         # Add wealth tier
-        if balance >= 100000:
-            tier = "💎 Diamond Tier"
-        elif balance >= 50000:
-            tier = "🏆 Gold Tier"
-        elif balance >= 25000:
-            tier = "🥈 Silver Tier"
-        elif balance >= 10000:
-            tier = "🥉 Bronze Tier"
-        else:
-            tier = "🌱 Starter"
+        tier = WEALTH_TIERS[bisect_right(WEALTH_TIER_THRESHOLDS, balance)]
         
         embed.add_field(name="Wealth Tier", value=tier, inline=True)
         
@@ -89,14 +211,45 @@ class Economy(commands.Cog):
     @app_commands.command(name="daily", description="🎁 Claim your daily reward")
     async def daily(self, interaction: discord.Interaction):
         """Claim daily reward"""
-        if not await self.can_daily(interaction.user.id, interaction.guild.id):
-            user_data = await self.bot.db.economy.find_one({
-                "user_id": interaction.user.id,
-                "guild_id": interaction.guild.id
-            })
-            last_daily = user_data["last_daily"]
-            next_daily = last_daily + timedelta(hours=24)
-            time_left = next_daily - datetime.utcnow()
+        # Calculate reward (base 500 + bonus)
+        base_reward = 500
+        bonus = random.randint(0, 200)
+        
+        # Claim the reward; an active cooldown means the update matches nothing and nothing is written
+        user_data, next_daily = await self.claim_cooldown_reward(
+            interaction.user.id,
+            interaction.guild.id,
+            "last_daily",
+            timedelta(hours=24),
+            [
+                {"$set": {
+                    # Within 48 hours = streak continues
+                    "daily_streak": {"$cond": [
+                        {"$gte": ["$last_daily", {"$subtract": ["$$NOW", 2 * DAY_MS]}]},
+                        {"$add": [{"$ifNull": ["$daily_streak", 1]}, 1]},
+                        1
+                    ]},
+                    "last_daily": "$$NOW"
+                }},
+                # Streak bonus (up to 7 days)
+                {"$set": {
+                    "balance": {"$add": [
+                        {"$ifNull": ["$balance", 0]},
+                        base_reward + bonus,
+                        {"$multiply": [{"$min": [{"$subtract": ["$daily_streak", 1]}, 6]}, 50]}
+                    ]}
+                }}
+            ],
+            {
+                "balance": base_reward + bonus,
+                "daily_streak": 1,
+                "last_daily": datetime.now(timezone.utc)
+            },
+            {"daily_streak": 1, "balance": 1, "_id": 0}
+        )
+        
+        if not user_data:
+            time_left = max(next_daily - datetime.now(timezone.utc), timedelta(0))
             
             hours = int(time_left.total_seconds() // 3600)
             minutes = int((time_left.total_seconds() % 3600) // 60)
@@ -105,108 +258,72 @@ class Economy(commands.Cog):
             await interaction.response.send_message(embed=embed, ephemeral=True)
             return
         
-        # Calculate reward (base 500 + bonus)
-        base_reward = 500
-        bonus = random.randint(0, 200)
-        total_reward = base_reward + bonus
-        
-        # Check for streak bonus (simplified)
-        user_data = await self.bot.db.economy.find_one({
-            "user_id": interaction.user.id,
-            "guild_id": interaction.guild.id
-        })
-        
-        streak = 1
-        if user_data and "last_daily" in user_data:
-            last_daily = user_data["last_daily"]
-            if datetime.utcnow() - last_daily <= timedelta(hours=48):  # Within 48 hours = streak continues
-                streak = user_data.get("daily_streak", 1) + 1
-        
-        # Streak bonus (up to 7 days)
+        streak = user_data["daily_streak"]
         streak_bonus = min(streak - 1, 6) * 50
-        total_reward += streak_bonus
-        
-        # Update balance and daily info
-        new_balance = await self.update_balance(interaction.user.id, interaction.guild.id, total_reward)
-        
-        await self.bot.db.economy.update_one(
-            {"user_id": interaction.user.id, "guild_id": interaction.guild.id},
-            {
-                "$set": {
-                    "last_daily": datetime.utcnow(),
-                    "daily_streak": streak
-                }
-            },
-            upsert=True
-        )
+        total_reward = base_reward + bonus + streak_bonus
+        new_balance = user_data["balance"]
+        self._cache_balance(interaction.user.id, interaction.guild.id, new_balance)
         
-        embed = EmbedBuilder.create(
-            title="🎁 Daily Reward Claimed!",
-            description=f"You received **{total_reward:,}** Nova Coins!",
-            color=discord.Color.from_rgb(240, 230, 140)
-        )
-        
-        embed.add_field(name="Base Reward", value=f"{base_reward:,} coins", inline=True)
+        fields = [{"name": "Base Reward", "value": f"{base_reward:,} coins", "inline": True}]
         if bonus > 0:
-            embed.add_field(name="Bonus", value=f"{bonus:,} coins", inline=True)
+            fields.append({"name": "Bonus", "value": f"{bonus:,} coins", "inline": True})
         if streak_bonus > 0:
-            embed.add_field(name="Streak Bonus", value=f"{streak_bonus:,} coins", inline=True)
+            fields.append({"name": "Streak Bonus", "value": f"{streak_bonus:,} coins", "inline": True})
         
-        embed.add_field(name="Daily Streak", value=f"{streak} day{'s' if streak != 1 else ''}", inline=True)
-      
-      embed.add_field(name="New Balance", value=f"{new_balance:,} coins", inline=True)
+        fields.append({"name": "Daily Streak", "value": f"{streak} day{'s' if streak != 1 else ''}", "inline": True})
+        fields.append({"name": "New Balance", "value": f"{new_balance:,} coins", "inline": True})
+        
+        embed = discord.Embed.from_dict({
+            "title": "🎁 Daily Reward Claimed!",
+            "description": f"You received **{total_reward:,}** Nova Coins!",
+            "color": ECONOMY_COLOR.value,
+            "fields": fields,
+            "footer": EMBED_FOOTER
+        })
         
         await interaction.response.send_message(embed=embed)
     
     @app_commands.command(name="work", description="💼 Work to earn money")
     async def work(self, interaction: discord.Interaction):
         """Work to earn money"""
-        # Check cooldown (1 hour)
-        user_data = await self.bot.db.economy.find_one({
-            "user_id": interaction.user.id,
-            "guild_id": interaction.guild.id
-        })
-        
-        if user_data and "last_work" in user_data:
-            last_work = user_data["last_work"]
-            if datetime.utcnow() - last_work < timedelta(hours=1):
-                time_left = timedelta(hours=1) - (datetime.utcnow() - last_work)
-                minutes = int(time_left.total_seconds() // 60)
-                
-                embed = EmbedBuilder.error(f"You're too tired to work right now!\nTry again in {minutes} minutes.")
-                await interaction.response.send_message(embed=embed, ephemeral=True)
-                return
-        
-        # Work scenarios
-        jobs = [
-            ("You delivered packages for Nova Express", random.randint(100, 250)),
-            ("You helped at the local café", random.randint(80, 200)),
-            ("You walked dogs in the park", random.randint(60, 150)),
-            ("You did freelance coding", random.randint(150, 300)),
-            ("You tutored someone in Discord", random.randint(90, 180)),
-            ("You cleaned windows downtown", random.randint(70, 160)),
-            ("You helped an elderly neighbor", random.randint(50, 120)),
-            ("You organized a local event", random.randint(200, 400)),
-        ]
-        
-        job_description, earnings = random.choice(jobs)
-        
-        # Update balance and work time
-        new_balance = await self.update_balance(interaction.user.id, interaction.guild.id, earnings)
-        
-        await self.bot.db.economy.update_one(
-            {"user_id": interaction.user.id, "guild_id": interaction.guild.id},
-            {"$set": {"last_work": datetime.utcnow()}},
-            upsert=True
+        job_description, low, high = random.choice(JOBS)
+        earnings = random.randint(low, high)
+        
+        # Pay and start the cooldown (1 hour)
+        user_data, next_work = await self.claim_cooldown_reward(
+            interaction.user.id,
+            interaction.guild.id,
+            "last_work",
+            timedelta(hours=1),
+            [{"$set": {
+                "balance": {"$add": [{"$ifNull": ["$balance", 0]}, earnings]},
+                "last_work": "$$NOW"
+            }}],
+            {"balance": earnings, "last_work": datetime.now(timezone.utc)},
+            {"balance": 1, "_id": 0}
         )
         
-        embed = EmbedBuilder.create(
-            title="💼 Work Complete!",
-            description=job_description,
-            color=discord.Color.from_rgb(144, 238, 144)
-        )
-        embed.add_field(name="Earned", value=f"{earnings:,} coins", inline=True)
-        embed.add_field(name="New Balance", value=f"{new_balance:,} coins", inline=True)
+        if not user_data:
+            time_left = max(next_work - datetime.now(timezone.utc), timedelta(0))
+            minutes = int(time_left.total_seconds() // 60)
+            
+            embed = EmbedBuilder.error(f"You're too tired to work right now!\nTry again in {minutes} minutes.")
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+            return
+        
+        new_balance = user_data["balance"]
+        self._cache_balance(interaction.user.id, interaction.guild.id, new_balance)
+        
+        embed = discord.Embed.from_dict({
+            "title": "💼 Work Complete!",
+            "description": job_description,
+            "color": WORK_COLOR.value,
+            "fields": [
+                {"name": "Earned", "value": f"{earnings:,} coins", "inline": True},
+                {"name": "New Balance", "value": f"{new_balance:,} coins", "inline": True}
+            ],
+            "footer": EMBED_FOOTER
+        })
         
         await interaction.response.send_message(embed=embed)
     
@@ -215,13 +332,11 @@ class Economy(commands.Cog):
     async def gamble(self, interaction: discord.Interaction, amount: int):
         """Gamble coins"""
         if amount < 10:
-            embed = EmbedBuilder.error("Minimum bet is 10 coins!")
-            await interaction.response.send_message(embed=embed, ephemeral=True)
+            await interaction.response.send_message(embed=MIN_BET_ERROR, ephemeral=True)
             return
         
         if amount > 10000:
-            embed = EmbedBuilder.error("Maximum bet is 10,000 coins!")
-            await interaction.response.send_message(embed=embed, ephemeral=True)
+            await interaction.response.send_message(embed=MAX_BET_ERROR, ephemeral=True)
             return
         
         current_balance = await self.get_user_balance(interaction.user.id, interaction.guild.id)
@@ -231,30 +346,56 @@ class Economy(commands.Cog):
             await interaction.response.send_message(embed=embed, ephemeral=True)
             return
         
-        # Gambling logic (45% win chance)
-        win = random.random() < 0.45
+        # Gambling logic (45% win chance), decided from a single 32-bit draw
+        roll = random.getrandbits(32)
+        win = roll < GAMBLE_WIN_THRESHOLD
+        
+        if win:
+            # Win 1.5x to 2x the bet, taking the multiplier (in millionths) from the same draw
+            multiplier_ppm = 1_500_000 + roll % 500_001
+            winnings = amount * multiplier_ppm // 1_000_000 - amount
+            delta = winnings
+        else:
+            delta = -amount
+        
+        # Settle only if the stake is still there, so a stale cached balance can't overdraw
+        guild_id = interaction.guild.id
+        user_data = await self.bot.db.economy.find_one_and_update(
+            {"user_id": interaction.user.id, "guild_id": guild_id, "balance": {"$gte": amount}},
+            {"$inc": {"balance": delta}},
+            projection={"balance": 1, "_id": 0},
+            return_document=ReturnDocument.AFTER
+        )
+        
+        if not user_data:
+            # The cached balance was stale; read the real one
+            user_data = await self.bot.db.economy.find_one(
+                {"user_id": interaction.user.id, "guild_id": guild_id},
+                {"balance": 1, "_id": 0}
+            )
+            current_balance = user_data.get("balance", 0) if user_data else 0
+            self._cache_balance(interaction.user.id, guild_id, current_balance)
+            embed = EmbedBuilder.error(f"You don't have enough coins! You have {current_balance:,} coins.")
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+            return
+        
+        new_balance = user_data["balance"]
+        self._cache_balance(interaction.user.id, guild_id, new_balance)
         
         if win:
-            # Win 1.5x to 2x the bet
-            multiplier = random.uniform(1.5, 2.0)
-            winnings = int(amount * multiplier) - amount
-            new_balance = await self.update_balance(interaction.user.id, interaction.guild.id, winnings)
-            
             embed = EmbedBuilder.create(
                 title="🎉 You Won!",
                 description=f"Lucky you! You won **{winnings:,}** coins!",
-                color=discord.Color.green()
+                color=WIN_COLOR
             )
             embed.add_field(name="Bet", value=f"{amount:,} coins", inline=True)
             embed.add_field(name="Won", value=f"{winnings:,} coins", inline=True)
             embed.add_field(name="New Balance", value=f"{new_balance:,} coins", inline=True)
         else:
-            new_balance = await self.update_balance(interaction.user.id, interaction.guild.id, -amount)
-            
             embed = EmbedBuilder.create(
                 title="💸 You Lost!",
                 description=f"Better luck next time! You lost **{amount:,}** coins.",
-                color=discord.Color.red()
+                color=LOSS_COLOR
             )
             embed.add_field(name="Lost", value=f"{amount:,} coins", inline=True)
             embed.add_field(name="New Balance", value=f"{new_balance:,} coins", inline=True)
@@ -269,35 +410,62 @@ class Economy(commands.Cog):
     async def give(self, interaction: discord.Interaction, user: discord.Member, amount: int):
         """Give coins to another user"""
         if user == interaction.user:
-            embed = EmbedBuilder.error("You can't give coins to yourself!")
-            await interaction.response.send_message(embed=embed, ephemeral=True)
+            await interaction.response.send_message(embed=SELF_GIVE_ERROR, ephemeral=True)
             return
         
         if user.bot:
-            embed = EmbedBuilder.error("You can't give coins to bots!")
-            await interaction.response.send_message(embed=embed, ephemeral=True)
+            await interaction.response.send_message(embed=BOT_GIVE_ERROR, ephemeral=True)
             return
         
         if amount < 1:
-            embed = EmbedBuilder.error("You must give at least 1 coin!")
-            await interaction.response.send_message(embed=embed, ephemeral=True)
+            await interaction.response.send_message(embed=MIN_GIVE_ERROR, ephemeral=True)
             return
         
-        current_balance = await self.get_user_balance(interaction.user.id, interaction.guild.id)
+        guild_id = interaction.guild.id
+        current_balance = await self.get_user_balance(interaction.user.id, guild_id)
         
         if amount > current_balance:
             embed = EmbedBuilder.error(f"You don't have enough coins! You have {current_balance:,} coins.")
             await interaction.response.send_message(embed=embed, ephemeral=True)
             return
         
-        # Transfer coins
-        sender_balance = await self.update_balance(interaction.user.id, interaction.guild.id, -amount)
-        receiver_balance = await self.update_balance(user.id, interaction.guild.id, amount)
+        # Debit only if the coins are still there, so concurrent transfers can't overdraw
+        sender = await self.bot.db.economy.find_one_and_update(
+            {"user_id": interaction.user.id, "guild_id": guild_id, "balance": {"$gte": amount}},
+            {"$inc": {"balance": -amount}},
+            projection={"balance": 1, "_id": 0},
+            return_document=ReturnDocument.AFTER
+        )
+        
+        if not sender:
+            # The cached balance was stale; read the real one
+            user_data = await self.bot.db.economy.find_one(
+                {"user_id": interaction.user.id, "guild_id": guild_id},
+                {"balance": 1, "_id": 0}
+            )
+            current_balance = user_data.get("balance", 0) if user_data else 0
+            self._cache_balance(interaction.user.id, guild_id, current_balance)
+            embed = EmbedBuilder.error(f"You don't have enough coins! You have {current_balance:,} coins.")
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+            return
+        
+        receiver = await self.bot.db.economy.find_one_and_update(
+            {"user_id": user.id, "guild_id": guild_id},
+            {"$inc": {"balance": amount}},
+            projection={"balance": 1, "_id": 0},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        
+        sender_balance = sender["balance"]
+        receiver_balance = receiver["balance"]
+        self._cache_balance(interaction.user.id, guild_id, sender_balance)
+        self._cache_balance(user.id, guild_id, receiver_balance)
         
         embed = EmbedBuilder.create(
             title="💝 Coins Transferred!",
             description=f"{interaction.user.mention} gave **{amount:,}** coins to {user.mention}!",
-            color=discord.Color.from_rgb(255, 182, 193)
+            color=GIFT_COLOR
         )
         embed.add_field(name="Your Balance", value=f"{sender_balance:,} coins", inline=True)
         embed.add_field(name=f"{user.display_name}'s Balance", value=f"{receiver_balance:,} coins", inline=True)
@@ -311,7 +479,8 @@ class Economy(commands.Cog):
         
         # Get top 10 users by balance
         cursor = self.bot.db.economy.find(
-            {"guild_id": interaction.guild.id}
+            {"guild_id": interaction.guild.id},
+            {"user_id": 1, "balance": 1, "_id": 0}
         ).sort("balance", -1).limit(10)
         
         users = await cursor.to_list(length=10)
@@ -320,7 +489,7 @@ class Economy(commands.Cog):
             embed = EmbedBuilder.create(
                 title="🏆 Economy Leaderboard",
                 description="No one has earned coins yet! Use `/daily` or `/work` to get started!",
-                color=discord.Color.from_rgb(255, 215, 0)
+                color=LEADERBOARD_COLOR
             )
             await interaction.followup.send(embed=embed)
             return
@@ -328,27 +497,41 @@ class Economy(commands.Cog):
         embed = EmbedBuilder.create(
             title="🏆 Economy Leaderboard",
             description="The richest users in this server!",
-            color=discord.Color.from_rgb(255, 215, 0)
+            color=LEADERBOARD_COLOR
         )
         
+        # Resolve members from the cache, with one gateway query for the rest
+        members = {}
+        missing = []
+        for user_data in users:
+            member = interaction.guild.get_member(user_data["user_id"])
+            if member:
+                members[member.id] = member
+            else:
+                missing.append(user_data["user_id"])
+        
+        if missing:
+            try:
+                fetched = await interaction.guild.query_members(user_ids=missing, limit=len(missing))
+                members.update({member.id: member for member in fetched})
+            except (asyncio.TimeoutError, discord.ClientException):
+                pass
+        
         leaderboard_text = ""
         for i, user_data in enumerate(users, 1):
-            try:
-                user = self.bot.get_user(user_data["user_id"])
-                if user:
-                    if i == 1:
-                        emoji = "🥇"
-                    elif i == 2:
-                        emoji = "🥈"
-                    elif i == 3:
-                        emoji = "🥉"
-                    else:
-                        emoji = f"{i}."
-                    
-                    balance = user_data["balance"]
-                    leaderboard_text += f"{emoji} **{user.display_name}** - {balance:,} coins\n"
-            except:
-                continue
+            user = members.get(user_data["user_id"])
+            if user:
+                if i == 1:
+                    emoji = "🥇"
+                elif i == 2:
+                    emoji = "🥈"
+                elif i == 3:
+                    emoji = "🥉"
+                else:
+                    emoji = f"{i}."
+                
+                balance = user_data["balance"]
+                leaderboard_text += f"{emoji} **{user.display_name}** - {balance:,} coins\n"
         
         if leaderboard_text:
             embed.add_field(name="Top Users", value=leaderboard_text, inline=False)
@@ -358,33 +541,7 @@ class Economy(commands.Cog):
     @app_commands.command(name="shop", description="🛒 View or buy items from the shop")
     async def shop(self, interaction: discord.Interaction):
         """View the shop (placeholder implementation)"""
-        embed = EmbedBuilder.create(
-            title="🛒 Nova Shop",
-            description="Welcome to the Nova Shop! (Coming Soon)",
-            color=discord.Color.from_rgb(240, 230, 140)
-        )
-        
-        # Placeholder shop items
-        shop_items = [
-            {"name": "🌟 VIP Role", "price": 50000, "description": "Get a special VIP role!"},
-            {"name": "🎨 Custom Color", "price": 25000, "description": "Choose your role color!"},
-            {"name": "💝 Gift Box", "price": 10000, "description": "Random rewards inside!"},
-            {"name": "🏆 Trophy", "price": 15000, "description": "Show off your wealth!"},
-            {"name": "🌸 Nova Badge", "price": 5000, "description": "Cute Nova badge for your profile!"},
-        ]
-        
-        shop_text = ""
-        for item in shop_items:
-            shop_text += f"**{item['name']}** - {item['price']:,} coins\n{item['description']}\n\n"
-        
-        embed.add_field(name="Available Items", value=shop_text, inline=False)
-        embed.add_field(
-            name="Note", 
-            value="Shop functionality is coming soon! Items will be purchasable in a future update.", 
-            inline=False
-        )
-        
-        await interaction.response.send_message(embed=embed)
+        await interaction.response.send_message(embed=SHOP_EMBED)
 
 
 async def setup(bot: commands.Bot):
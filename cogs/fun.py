@@ -4,6 +4,7 @@ Provides entertainment and game commands.
 """
 
 import random
+import re
 from typing import Optional
 
 import discord
@@ -12,6 +13,86 @@ from discord.ext import commands
 
 from utils.embeds import EmbedBuilder
 
+# Embed colors, created once
+FUN_COLOR = discord.Color.from_rgb(255, 192, 203)
+COMPLIMENT_COLOR = discord.Color.from_rgb(255, 182, 193)
+RATING_COLOR = discord.Color.from_rgb(255, 215, 0)
+
+# Magic 8-ball answers
+EIGHT_BALL_RESPONSES = (
+    "It is certain! ✨",
+    "Without a doubt! 💫",
+    "Yes definitely! 🌟",
+    "You may rely on it! 💖",
+    "As I see it, yes! 👀",
+    "Most likely! 🌸",
+    "Outlook good! 🌺",
+    "Yes! 💕",
+    "Signs point to yes! 👍",
+    "Reply hazy, try again... 🌫️",
+    "Ask again later! ⏰",
+    "Better not tell you now... 🤫",
+    "Cannot predict now! 🔮",
+    "Concentrate and ask again! 🧘",
+    "Don't count on it! 😅",
+    "My reply is no! ❌",
+    "My sources say no! 📚",
+    "Outlook not so good... 😰",
+    "Very doubtful! 🤔",
+)
+
+# Jokes as (setup, punchline)
+JOKES = (
+    ("Why don't scientists trust atoms?", "Because they make up everything! 😄"),
+    ("Why did the scarecrow win an award?", "He was outstanding in his field! 🌾"),
+    ("Why don't eggs tell jokes?", "They'd crack each other up! 🥚"),
+    ("What do you call a fake noodle?", "An impasta! 🍝"),
+    ("Why did the math book look so sad?", "Because it had too many problems! 📚"),
+    ("What do you call a bear with no teeth?", "A gummy bear! 🐻"),
+    ("Why don't skeletons fight each other?", "They don't have the guts! 💀"),
+    ("What do you call a dinosaur that crashes his car?", "Tyrannosaurus Wrecks! 🦕"),
+    ("Why can't a bicycle stand up by itself?", "It's two tired! 🚲"),
+    ("What do you call a fish wearing a crown?", "A king fish! 👑🐟"),
+)
+
+# Wholesome compliments
+COMPLIMENTS = (
+    "You're absolutely amazing! ✨",
+    "Your smile could light up the whole server! 😊",
+    "You have such a wonderful personality! 💖",
+    "You're incredibly thoughtful and kind! 🌸",
+    "Your creativity is inspiring! 🎨",
+    "You make everyone around you happier! 🌟",
+    "You're stronger than you know! 💪",
+    "Your positive energy is contagious! ⚡",
+    "You're a true gem! 💎",
+    "You have an amazing sense of humor! 😄",
+    "You're so talented! 🌺",
+    "Your kindness makes the world better! 🌍",
+    "You're absolutely fabulous! ✨",
+    "You have such a beautiful heart! 💝",
+    "You're one of a kind! 🦄",
+)
+
+# Things /rate always likes, matched anywhere in the input
+RATE_BONUS_PATTERN = re.compile(r"pizza|cat|dog|music", re.IGNORECASE)
+
+# Star bars and verdicts for /rate, indexed by rating (0-10)
+RATING_STARS = tuple("⭐" * i + "☆" * (10 - i) for i in range(11))
+RATING_FLAVOR = (
+    ("Oof, that's rough! 😅",) * 3 +
+    ("Could be better... 🤔",) * 2 +
+    ("Not bad! 👍",) * 2 +
+    ("Pretty great! 😊",) * 2 +
+    ("Absolutely amazing! 🤩",) * 2
+)
+
+# Error embeds with constant text, built once and reused
+SIDES_RANGE_ERROR = EmbedBuilder.error("Number of sides must be between 2 and 100!")
+DICE_COUNT_ERROR = EmbedBuilder.error("Number of dice must be between 1 and 10!")
+TOO_FEW_OPTIONS_ERROR = EmbedBuilder.error("Please provide at least 2 options separated by commas!")
+TOO_MANY_OPTIONS_ERROR = EmbedBuilder.error("Please provide no more than 10 options!")
+
 
 class Fun(commands.Cog):
     """Fun and entertainment commands"""
@@ -23,33 +104,11 @@ class Fun(commands.Cog):
     @app_commands.describe(question="Your question for the magic 8-ball")
     async def eight_ball(self, interaction: discord.Interaction, question: str):
         """Magic 8-ball command"""
-        responses = [
-            "It is certain! ✨",
-            "Without a doubt! 💫",
-            "Yes definitely! 🌟",
-            "You may rely on it! 💖",
-            "As I see it, yes! 👀",
-            "Most likely! 🌸",
-            "Outlook good! 🌺",
-            "Yes! 💕",
-            "Signs point to yes! 👍",
-            "Reply hazy, try again... 🌫️",
-            "Ask again later! ⏰",
-            "Better not tell you now... 🤫",
-            "Cannot predict now! 🔮",
-            "Concentrate and ask again! 🧘",
-            "Don't count on it! 😅",
-            "My reply is no! ❌",
-            "My sources say no! 📚",
-            "Outlook not so good... 😰",
-            "Very doubtful! 🤔",
-        ]
-        
-        response = random.choice(responses)
+        response = random.choice(EIGHT_BALL_RESPONSES)
         
         embed = EmbedBuilder.create(
             title="🎱 Magic 8-Ball",
-            color=discord.Color.from_rgb(255, 192, 203)
+            color=FUN_COLOR
         )
         embed.add_field(name="Question", value=question, inline=False)
         embed.add_field(name="Answer", value=response, inline=False)
@@ -64,21 +123,19 @@ class Fun(commands.Cog):
     async def roll(self, interaction: discord.Interaction, sides: int = 6, count: int = 1):
         """Roll dice"""
         if sides < 2 or sides > 100:
-            embed = EmbedBuilder.error("Number of sides must be between 2 and 100!")
-            await interaction.response.send_message(embed=embed, ephemeral=True)
+            await interaction.response.send_message(embed=SIDES_RANGE_ERROR, ephemeral=True)
             return
         
         if count < 1 or count > 10:
-            embed = EmbedBuilder.error("Number of dice must be between 1 and 10!")
-            await interaction.response.send_message(embed=embed, ephemeral=True)
+            await interaction.response.send_message(embed=DICE_COUNT_ERROR, ephemeral=True)
             return
         
-        rolls = [random.randint(1, sides) for _ in range(count)]
+        rolls = random.choices(range(1, sides + 1), k=count)
         total = sum(rolls)
         
         embed = EmbedBuilder.create(
             title="🎲 Dice Roll",
-            color=discord.Color.from_rgb(255, 192, 203)
+            color=FUN_COLOR
         )
         
         if count == 1:
@@ -99,7 +156,7 @@ class Fun(commands.Cog):
         embed = EmbedBuilder.create(
             title="🪙 Coin Flip",
             description=f"{emoji} **{result}**!",
-            color=discord.Color.from_rgb(255, 192, 203)
+            color=FUN_COLOR
         )
         
         await interaction.response.send_message(embed=embed)
@@ -108,16 +165,17 @@ class Fun(commands.Cog):
     @app_commands.describe(options="Options separated by commas (e.g., pizza, burger, tacos)")
     async def choose(self, interaction: discord.Interaction, options: str):
         """Choose between options"""
-        choices = [choice.strip() for choice in options.split(",")]
+        # Split at most 10 times: an 11th part means too many options, however long the input
+        parts = options.split(",", 10)
         
-        if len(choices) < 2:
-            embed = EmbedBuilder.error("Please provide at least 2 options separated by commas!")
-            await interaction.response.send_message(embed=embed, ephemeral=True)
+        if len(parts) > 10:
+            await interaction.response.send_message(embed=TOO_MANY_OPTIONS_ERROR, ephemeral=True)
             return
         
-        if len(choices) > 10:
-            embed = EmbedBuilder.error("Please provide no more than 10 options!")
-            await interaction.response.send_message(embed=embed, ephemeral=True)
+        choices = [choice for choice in map(str.strip, parts) if choice]
+        
+        if len(choices) < 2:
+            await interaction.response.send_message(embed=TOO_FEW_OPTIONS_ERROR, ephemeral=True)
             return
         
         choice = random.choice(choices)
@@ -125,7 +183,7 @@ class Fun(commands.Cog):
         embed = EmbedBuilder.create(
             title="🤔 Nova's Choice",
             description=f"I choose... **{choice}**! 🌸",
-            color=discord.Color.from_rgb(255, 192, 203)
+            color=FUN_COLOR
         )
         
         embed.add_field(name="Options", value=", ".join(choices), inline=False)
@@ -135,24 +193,11 @@ class Fun(commands.Cog):
     @app_commands.command(name="joke", description="😂 Get a random joke")
     async def joke(self, interaction: discord.Interaction):
         """Tell a random joke"""
-        jokes = [
-            ("Why don't scientists trust atoms?", "Because they make up everything! 😄"),
-            ("Why did the scarecrow win an award?", "He was outstanding in his field! 🌾"),
-            ("Why don't eggs tell jokes?", "They'd crack each other up! 🥚"),
-            ("What do you call a fake noodle?", "An impasta! 🍝"),
-            ("Why did the math book look so sad?", "Because it had too many problems! 📚"),
-            ("What do you call a bear with no teeth?", "A gummy bear! 🐻"),
-            ("Why don't skeletons fight each other?", "They don't have the guts! 💀"),
-            ("What do you call a dinosaur that crashes his car?", "Tyrannosaurus Wrecks! 🦕"),
-            ("Why can't a bicycle stand up by itself?", "It's two tired! 🚲"),
-            ("What do you call a fish wearing a crown?", "A king fish! 👑🐟"),
-        ]
-        
-        setup, punchline = random.choice(jokes)
+        setup, punchline = random.choice(JOKES)
         
         embed = EmbedBuilder.create(
             title="😂 Here's a joke for you!",
-            color=discord.Color.from_rgb(255, 192, 203)
+            color=FUN_COLOR
         )
         embed.add_field(name="Setup", value=setup, inline=False)
         embed.add_field(name="Punchline", value=punchline, inline=False)
@@ -165,30 +210,12 @@ class Fun(commands.Cog):
         """Give someone a compliment"""
         target = user if user else interaction.user
         
-        compliments = [
-            "You're absolutely amazing! ✨",
-            "Your smile could light up the whole server! 😊",
-            "You have such a wonderful personality! 💖",
-            "You're incredibly thoughtful and kind! 🌸",
-            "Your creativity is inspiring! 🎨",
-            "You make everyone around you happier! 🌟",
-            "You're stronger than you know! 💪",
-            "Your positive energy is contagious! ⚡",
-            "You're a true gem! 💎",
-            "You have an amazing sense of humor! 😄",
-            "You're so talented! 🌺",
-            "Your kindness makes the world better! 🌍",
-            "You're absolutely fabulous! ✨",
-            "You have such a beautiful heart! 💝",
-            "You're one of a kind! 🦄",
-        ]
-        
-        compliment = random.choice(compliments)
+        compliment = random.choice(COMPLIMENTS)
         
         embed = EmbedBuilder.create(
             title="💖 Compliment Time!",
             description=f"{target.mention}, {compliment}",
-            color=discord.Color.from_rgb(255, 182, 193)
+            color=COMPLIMENT_COLOR
         )
         
         await interaction.response.send_message(embed=embed)
@@ -197,36 +224,25 @@ class Fun(commands.Cog):
     @app_commands.describe(thing="What do you want me to rate?")
     async def rate(self, interaction: discord.Interaction, thing: str):
         """Rate something"""
-        rating = random.randint(1, 10)
-        
         # Special cases for fun
         if "nova" in thing.lower():
             rating = 10
-        elif any(word in thing.lower() for word in ["pizza", "cat", "dog", "music"]):
+        elif RATE_BONUS_PATTERN.search(thing):
             rating = random.randint(8, 10)
+        else:
+            rating = random.randint(1, 10)
         
-        stars = "⭐" * rating + "☆" * (10 - rating)
+        stars = RATING_STARS[rating]
         
         embed = EmbedBuilder.create(
             title="⭐ Rating Time!",
-            color=discord.Color.from_rgb(255, 215, 0)
+            color=RATING_COLOR
         )
         embed.add_field(name="Item", value=thing, inline=False)
         embed.add_field(name="Rating", value=f"{rating}/10\n{stars}", inline=False)
         
         # Add flavor text based on rating
-        if rating >= 9:
-            flavor = "Absolutely amazing! 🤩"
-        elif rating >= 7:
-            flavor = "Pretty great! 😊"
-        elif rating >= 5:
-            flavor = "Not bad! 👍"
-        elif rating >= 3:
-            flavor = "Could be better... 🤔"
-        else:
-            flavor = "Oof, that's rough! 😅"
-        
-        embed.add_field(name="Verdict", value=flavor, inline=False)
+        embed.add_field(name="Verdict", value=RATING_FLAVOR[rating], inline=False)
         
         await interaction.response.send_message(embed=embed)
 
@@ -4,19 +4,60 @@ Provides giveaway management functionality.
 """
 
 import asyncio
-import random
+import heapq
+import logging
+import re
 from datetime import datetime, timedelta
-from typing import List, Optional
+from typing import Dict, List, Optional, Set, Tuple
 
 import discord
+from bson import ObjectId
 from discord import app_commands
-from discord.ext import commands, tasks
+from discord.ext import commands
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, PyMongoError
 
 from utils.embeds import EmbedBuilder
 
+logger = logging.getLogger(__name__)
+
+# Giveaway durations: a whole number followed by a single unit letter
+DURATION_PATTERN = re.compile(r"^(\d+)([smhdw])$")
+
+# Seconds to gather entries before refreshing a giveaway's entry count
+EMBED_REFRESH_INTERVAL = 3.0
+
+# Position of the "Entries" field on an active giveaway's embed
+ENTRIES_FIELD_INDEX = 2
+
+# Giveaway fields needed to end, announce or reroll a giveaway
+GIVEAWAY_RESULT_FIELDS = {
+    "guild_id": 1,
+    "channel_id": 1,
+    "message_id": 1,
+    "host_id": 1,
+    "prize": 1,
+    "winner_count": 1
+}
+
+# Most giveaways ended together in one batch
+END_BATCH_SIZE = 50
+
+# Seconds before retrying giveaways that failed to end
+END_RETRY_DELAY = 60
+
+# Seconds per duration unit
+DURATION_MULTIPLIERS = {
+    "s": 1,
+    "m": 60,
+    "h": 3600,
+    "d": 86400,
+    "w": 604800
+}
+
 
 class GiveawayView(discord.ui.View):
-    """Persistent view for giveaway participation"""
+    """Persistent view for giveaways posted before entry buttons carried the giveaway ID"""
     
     def __init__(self, bot: commands.Bot):
         super().__init__(timeout=None)
@@ -25,14 +66,104 @@ class GiveawayView(discord.ui.View):
     @discord.ui.button(label="🎉 Enter Giveaway", style=discord.ButtonStyle.green, custom_id="enter_giveaway")
     async def enter_giveaway(self, interaction: discord.Interaction, button: discord.ui.Button):
         """Enter the giveaway"""
-        # Get giveaway data
-        giveaway = await self.bot.db.giveaways.find_one({
-            "message_id": interaction.message.id,
-            "guild_id": interaction.guild.id,
-            "status": "active"
-        })
+        await self.bot.get_cog("Giveaways").enter_giveaway(interaction, {"message_id": interaction.message.id})
+
+
+class GiveawayEntryButton(discord.ui.DynamicItem[discord.ui.Button], template=r"giveaway:enter:(?P<id>[0-9a-f]{24})"):
+    """Persistent entry button that carries its giveaway's ID in the custom_id"""
+    
+    def __init__(self, giveaway_id: ObjectId):
+        super().__init__(
+            discord.ui.Button(
+                label="🎉 Enter Giveaway",
+                style=discord.ButtonStyle.green,
+                custom_id=f"giveaway:enter:{giveaway_id}"
+            )
+        )
+        self.giveaway_id = giveaway_id
+    
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Button, match):
+        """Rebuild the button from a clicked custom_id"""
+        return cls(ObjectId(match["id"]))
+    
+    async def callback(self, interaction: discord.Interaction):
+        """Enter the giveaway"""
+        await interaction.client.get_cog("Giveaways").enter_giveaway(interaction, {"_id": self.giveaway_id})
+
+
+class Giveaways(commands.Cog):
+    """Giveaway management system"""
+    
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
         
-        if not giveaway:
+        # Entry buttons: per-giveaway IDs in the custom_id, plus the fixed-ID view on older messages
+        self.bot.add_dynamic_items(GiveawayEntryButton)
+        self.bot.add_view(GiveawayView(bot))
+        
+        # Min-heap of scheduled endings: (end_time, giveaway _id)
+        self._heap: List[Tuple[datetime, ObjectId]] = []
+        self._wakeup = asyncio.Event()
+        self._scheduler: Optional[asyncio.Task] = None
+        
+        # Pending entry count refreshes: message_id -> task, plus messages that had
+        # entries arrive while their refresh was already reading the count
+        self._pending_refresh: Dict[int, asyncio.Task] = {}
+        self._refresh_requested: Set[int] = set()
+    
+    async def cog_load(self):
+        """Schedule the active giveaways and start the scheduler"""
+        try:
+            await self.migrate_legacy_entries()
+        except Exception as e:
+            logger.error(f"Error migrating giveaway entries: {e}")
+        
+        try:
+            async for giveaway in self.bot.db.giveaways.find({"status": "active"}, {"end_time": 1}):
+                self._heap.append((giveaway["end_time"], giveaway["_id"]))
+            heapq.heapify(self._heap)
+        except Exception as e:
+            logger.error(f"Error loading giveaways: {e}")
+        
+        self._scheduler = asyncio.create_task(self.check_giveaways())
+    
+    async def migrate_legacy_entries(self):
+        """Bring older giveaway documents up to the current entry storage"""
+        async for giveaway in self.bot.db.giveaways.find({"entries": {"$exists": True}}, {"entries": 1}):
+            if giveaway["entries"]:
+                try:
+                    await self.bot.db.giveaway_entries.insert_many(
+                        [{"giveaway_id": giveaway["_id"], "user_id": user_id} for user_id in giveaway["entries"]],
+                        ordered=False
+                    )
+                except BulkWriteError:
+                    pass  # Entries moved by an earlier, interrupted run
+            
+            await self.bot.db.giveaways.update_one({"_id": giveaway["_id"]}, {"$unset": {"entries": ""}})
+        
+        # Giveaways started before the entry counter existed
+        async for giveaway in self.bot.db.giveaways.find({"status": "active", "entry_count": {"$exists": False}}, {"_id": 1}):
+            entry_count = await self.bot.db.giveaway_entries.count_documents({"giveaway_id": giveaway["_id"]})
+            await self.bot.db.giveaways.update_one({"_id": giveaway["_id"]}, {"$set": {"entry_count": entry_count}})
+    
+    def cog_unload(self):
+        """Clean up when cog is unloaded"""
+        self.bot.remove_dynamic_items(GiveawayEntryButton)
+        if self._scheduler:
+            self._scheduler.cancel()
+        for task in self._pending_refresh.values():
+            task.cancel()
+    
+    async def enter_giveaway(self, interaction: discord.Interaction, query: dict):
+        """Enter the giveaway matching a unique-key query (_id or message_id)"""
+        # Get giveaway data; status and guild are checked here so the lookup is a single unique key
+        giveaway = await self.bot.db.giveaways.find_one(
+            query,
+            {"guild_id": 1, "status": 1, "end_time": 1}
+        )
+        
+        if not giveaway or giveaway["status"] != "active" or giveaway["guild_id"] != interaction.guild.id:
             embed = EmbedBuilder.error("This giveaway is no longer active!")
             await interaction.response.send_message(embed=embed, ephemeral=True)
             return
@@ -43,85 +174,180 @@ class GiveawayView(discord.ui.View):
             await interaction.response.send_message(embed=embed, ephemeral=True)
             return
         
-        # Check if user is already entered
-        if interaction.user.id in giveaway.get("entries", []):
+        # Check requirements (placeholder for role requirements, etc.)
+        # This could be extended to check for required roles, server boosts, etc.
+        
+        # Add user to entries (the unique index rejects repeat entries)
+        try:
+            await self.bot.db.giveaway_entries.insert_one({
+                "giveaway_id": giveaway["_id"],
+                "user_id": interaction.user.id
+            })
+        except DuplicateKeyError:
             embed = EmbedBuilder.error("You're already entered in this giveaway!")
             await interaction.response.send_message(embed=embed, ephemeral=True)
             return
         
-        # Check requirements (placeholder for role requirements, etc.)
-        # This could be extended to check for required roles, server boosts, etc.
-        
-        # Add user to entries
-        await self.bot.db.giveaways.update_one(
-            {"message_id": interaction.message.id},
-            {"$push": {"entries": interaction.user.id}}
-        )
+        await self.bot.db.giveaways.update_one({"_id": giveaway["_id"]}, {"$inc": {"entry_count": 1}})
         
         # Update giveaway embed
-        await self.update_giveaway_embed(interaction.message, giveaway)
+        self.schedule_embed_refresh(interaction.message, giveaway)
         
         embed = EmbedBuilder.success("🎉 You've entered the giveaway! Good luck!")
         await interaction.response.send_message(embed=embed, ephemeral=True)
     
+    def schedule_embed_refresh(self, message: discord.Message, giveaway: dict) -> None:
+        """Refresh the giveaway embed shortly, folding in any entries that arrive meanwhile"""
+        if message.id in self._pending_refresh:
+            self._refresh_requested.add(message.id)
+        else:
+            self._pending_refresh[message.id] = asyncio.create_task(self.refresh_giveaway_embed(message, giveaway))
+    
+    async def refresh_giveaway_embed(self, message: discord.Message, giveaway: dict):
+        """Edit the giveaway embed once per refresh interval while entries keep arriving"""
+        try:
+            while True:
+                await asyncio.sleep(EMBED_REFRESH_INTERVAL)
+                
+                # The count read below covers every entry so far
+                self._refresh_requested.discard(message.id)
+                await self.update_giveaway_embed(message, giveaway)
+                
+                if message.id not in self._refresh_requested:
+                    break
+        finally:
+            # Stays registered until the edit is done, so ending the giveaway can cancel it
+            self._pending_refresh.pop(message.id, None)
+            self._refresh_requested.discard(message.id)
+    
     async def update_giveaway_embed(self, message: discord.Message, giveaway: dict):
         """Update the giveaway embed with current entry count"""
+        if not message.embeds:
+            return
+        
         try:
-            # Get updated data
-            updated_giveaway = await self.bot.db.giveaways.find_one({"_id": giveaway["_id"]})
-            entry_count = len(updated_giveaway.get("entries", []))
+            counter = await self.bot.db.giveaways.find_one({"_id": giveaway["_id"]}, {"entry_count": 1, "status": 1})
             
-            embed = EmbedBuilder.create(
-                title="🎉 Giveaway!",
-                description=f"**Prize:** {giveaway['prize']}\n**Hosted by:** <@{giveaway['host_id']}>",
-                color=discord.Color.from_rgb(255, 215, 0)
-            )
-            
-            embed.add_field(name="Ends", value=f"<t:{int(giveaway['end_time'].timestamp())}:R>", inline=True)
-            embed.add_field(name="Winners", value=str(giveaway['winner_count']), inline=True)
-            embed.add_field(name="Entries", value=str(entry_count), inline=True)
+            # An ended giveaway's message shows the result, which must not be overwritten
+            if not counter or counter["status"] != "active":
+                return
+            entry_count = counter.get("entry_count", 0)
             
-            embed.set_footer(text="Click the button below to enter!")
+            # Only the entry count changes, so reuse the embed already on the message
+            embed = message.embeds[0].copy()
+            embed.set_field_at(ENTRIES_FIELD_INDEX, name="Entries", value=str(entry_count), inline=True)
             
             await message.edit(embed=embed)
-        except:
-            pass
-
-
-class Giveaways(commands.Cog):
-    """Giveaway management system"""
-    
-    def __init__(self, bot: commands.Bot):
-        self.bot = bot
-        self.bot.add_view(GiveawayView(bot))
-        self.check_giveaways.start()
+        except discord.NotFound:
+            pass  # Message was deleted
+        except (discord.HTTPException, PyMongoError) as e:
+            # discord.py has already waited out any rate limit before giving up
+            logger.warning(f"Failed to refresh giveaway embed on message {message.id}: {e}")
     
-    def cog_unload(self):
-        """Clean up when cog is unloaded"""
-        self.check_giveaways.cancel()
+    def schedule_giveaway(self, end_time: datetime, giveaway_id: ObjectId) -> None:
+        """Add a giveaway ending to the schedule and wake the scheduler"""
+        heapq.heappush(self._heap, (end_time, giveaway_id))
+        self._wakeup.set()
     
-    @tasks.loop(minutes=1)
     async def check_giveaways(self):
-        """Check for ended giveaways"""
-        try:
-            # Find ended giveaways
-            ended_giveaways = await self.bot.db.giveaways.find({
-                "status": "active",
-                "end_time": {"$lte": datetime.utcnow()}
-            }).to_list(length=None)
+        """End giveaways as they come due, sleeping until the next scheduled ending"""
+        await self.bot.wait_until_ready()
+        
+        while True:
+            self._wakeup.clear()
             
-            for giveaway in ended_giveaways:
-                await self.end_giveaway(giveaway)
-        except Exception as e:
-            print(f"Error checking giveaways: {e}")
+            now = datetime.utcnow()
+            due = []
+            while self._heap and self._heap[0][0] <= now:
+                due.append(heapq.heappop(self._heap)[1])
+            
+            for start in range(0, len(due), END_BATCH_SIZE):
+                batch = due[start:start + END_BATCH_SIZE]
+                try:
+                    # Giveaways ended early with /gend are no longer active
+                    giveaways = await self.bot.db.giveaways.find(
+                        {"_id": {"$in": batch}, "status": "active"},
+                        GIVEAWAY_RESULT_FIELDS
+                    ).to_list(length=None)
+                    await self.end_giveaways(giveaways)
+                except Exception as e:
+                    logger.error(f"Error ending giveaways, retrying in {END_RETRY_DELAY}s: {e}")
+                    
+                    # Put the batch back; ending it again is safe once it has ended
+                    retry_at = datetime.utcnow() + timedelta(seconds=END_RETRY_DELAY)
+                    for giveaway_id in batch:
+                        heapq.heappush(self._heap, (retry_at, giveaway_id))
+            
+            timeout = (self._heap[0][0] - datetime.utcnow()).total_seconds() if self._heap else None
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
     
-    @check_giveaways.before_loop
-    async def before_check_giveaways(self):
-        """Wait until bot is ready"""
-        await self.bot.wait_until_ready()
+    async def end_giveaways(self, giveaways: List[dict]):
+        """End giveaways: pick winners, record all results in one write, then announce them"""
+        # MongoDB keeps millisecond precision; truncating lets this run's writes be matched later
+        now = datetime.utcnow()
+        now = now.replace(microsecond=now.microsecond // 1000 * 1000)
+        results = []
+        updates = []
+        
+        # Database errors propagate so the caller can retry or report them
+        picks = await asyncio.gather(*(self.pick_winners(giveaway) for giveaway in giveaways))
+        
+        for giveaway, (winners, entry_count) in zip(giveaways, picks):
+            results.append((giveaway, winners, entry_count))
+            # Only an active giveaway can end, so /gend and the scheduler can't both end one
+            updates.append((
+                {"_id": giveaway["_id"], "status": "active"},
+                {"$set": {"status": "ended", "ended_at": now, "winners": winners}}
+            ))
+        
+        if len(updates) > 1:
+            result = await self.bot.db.giveaways.bulk_write(
+                [UpdateOne(query, update) for query, update in updates],
+                ordered=False
+            )
+            if result.modified_count < len(updates):
+                # Some were ended elsewhere meanwhile; announce only the ones this write ended.
+                # The write has already happened, so a failed re-read must not reach the retry
+                # path (which only looks at active giveaways); announce them all instead
+                try:
+                    ended = await self.bot.db.giveaways.distinct(
+                        "_id",
+                        {"_id": {"$in": [giveaway["_id"] for giveaway in giveaways]}, "ended_at": now}
+                    )
+                    results = [item for item in results if item[0]["_id"] in ended]
+                except PyMongoError as e:
+                    logger.error(f"Failed to check which giveaways this run ended, announcing all of them: {e}")
+        elif updates:
+            result = await self.bot.db.giveaways.update_one(*updates[0])
+            if not result.modified_count:
+                results = []
+        
+        await asyncio.gather(*(self.announce_giveaway_end(*result) for result in results))
     
-    async def end_giveaway(self, giveaway: dict):
-        """End a giveaway and pick winners"""
+    async def pick_winners(self, giveaway: dict) -> Tuple[List[int], int]:
+        """Draw winners for a giveaway in the database; returns the winner IDs and the entry count"""
+        entry_filter = {"giveaway_id": giveaway["_id"]}
+        sampled, entry_count = await asyncio.gather(
+            self.bot.db.giveaway_entries.aggregate([
+                {"$match": entry_filter},
+                {"$sample": {"size": giveaway["winner_count"]}},
+                {"$project": {"_id": 0, "user_id": 1}}
+            ]).to_list(length=None),
+            self.bot.db.giveaway_entries.count_documents(entry_filter)
+        )
+        return [entry["user_id"] for entry in sampled], entry_count
+    
+    async def announce_giveaway_end(self, giveaway: dict, winners: List[int], entry_count: int):
+        """Show the result on the giveaway message and congratulate the winners"""
+        # Stop any entry count refresh, and let an in-flight edit settle before showing the result
+        pending = self._pending_refresh.pop(giveaway["message_id"], None)
+        if pending:
+            pending.cancel()
+            await asyncio.gather(pending, return_exceptions=True)
+        
         try:
             guild = self.bot.get_guild(giveaway["guild_id"])
             if not guild:
@@ -133,18 +359,11 @@ class Giveaways(commands.Cog):
             
             try:
                 message = await channel.fetch_message(giveaway["message_id"])
-            except:
+            except discord.HTTPException:
                 # Message was deleted
-                await self.bot.db.giveaways.update_one(
-                    {"_id": giveaway["_id"]},
-                    {"$set": {"status": "ended"}}
-                )
                 return
             
-            entries = giveaway.get("entries", [])
-            winner_count = min(giveaway["winner_count"], len(entries))
-            
-            if winner_count == 0:
+            if not winners:
                 # No entries
                 embed = EmbedBuilder.create(
                     title="🎉 Giveaway Ended",
@@ -153,8 +372,6 @@ class Giveaways(commands.Cog):
                 )
                 embed.add_field(name="Hosted by", value=f"<@{giveaway['host_id']}>", inline=True)
             else:
-                # Pick winners
-                winners = random.sample(entries, winner_count)
                 winner_mentions = [f"<@{winner_id}>" for winner_id in winners]
                 
                 embed = EmbedBuilder.create(
@@ -163,14 +380,12 @@ class Giveaways(commands.Cog):
                     color=discord.Color.from_rgb(255, 215, 0)
                 )
                 embed.add_field(name="Hosted by", value=f"<@{giveaway['host_id']}>", inline=True)
-                embed.add_field(name="Total Entries", value=str(len(entries)), inline=True)
-                
-                # Store winners
-                await self.bot.db.giveaways.update_one(
-                    {"_id": giveaway["_id"]},
-                    {"$set": {"winners": winners}}
-                )
-                
+                embed.add_field(name="Total Entries", value=str(entry_count), inline=True)
+            
+            # Update original message
+            await message.edit(embed=embed, view=None)
+            
+            if winners:
                 # Send congratulations message
                 congrats_embed = EmbedBuilder.create(
                     title="🎊 Congratulations!",
@@ -178,25 +393,21 @@ class Giveaways(commands.Cog):
                     color=discord.Color.from_rgb(255, 215, 0)
                 )
                 
-                for winner_id in winners:
-                    try:
-                        winner = guild.get_member(winner_id)
-                        if winner:
-                            await winner.send(embed=congrats_embed)
-                    except:
-                        pass
-            
-            # Update original message
-            await message.edit(embed=embed, view=None)
-            
-            # Mark as ended in database
-            await self.bot.db.giveaways.update_one(
-                {"_id": giveaway["_id"]},
-                {"$set": {"status": "ended", "ended_at": datetime.utcnow()}}
-            )
+                await asyncio.gather(
+                    *(self.congratulate_winner(guild, winner_id, congrats_embed) for winner_id in winners),
+                    return_exceptions=True
+                )
             
         except Exception as e:
-            print(f"Error ending giveaway: {e}")
+            logger.error(f"Error announcing the end of giveaway {giveaway['_id']}: {e}")
+    
+    async def congratulate_winner(self, guild: discord.Guild, winner_id: int, embed: discord.Embed):
+        """DM a giveaway winner, skipping members who left or have DMs closed"""
+        try:
+            winner = guild.get_member(winner_id) or await guild.fetch_member(winner_id)
+            await winner.send(embed=embed)
+        except discord.HTTPException:
+            pass
     
     @app_commands.command(name="gstart", description="🎉 Start a giveaway")
     @app_commands.describe(
@@ -265,13 +476,17 @@ class Giveaways(commands.Cog):
         
         embed.set_footer(text="Click the button below to enter!")
         
-        view = GiveawayView(self.bot)
+        # The ID is chosen up front so the entry button can carry it
+        giveaway_id = ObjectId()
+        view = discord.ui.View(timeout=None)
+        view.add_item(GiveawayEntryButton(giveaway_id))
         
-        await interaction.response.send_message("Giveaway starting...", ephemeral=True)
+        await interaction.response.defer(ephemeral=True, thinking=True)
         message = await target_channel.send(embed=embed, view=view)
         
         # Store in database
         await self.bot.db.giveaways.insert_one({
+            "_id": giveaway_id,
             "guild_id": interaction.guild.id,
             "channel_id": target_channel.id,
             "message_id": message.id,
@@ -280,16 +495,17 @@ class Giveaways(commands.Cog):
             "winner_count": winners,
             "start_time": datetime.utcnow(),
             "end_time": end_time,
-            "entries": [],
-            "status": "active"
+            "status": "active",
+            "entry_count": 0
         })
+        self.schedule_giveaway(end_time, giveaway_id)
         
         success_embed = EmbedBuilder.success(f"Giveaway started in {target_channel.mention}!")
         success_embed.add_field(name="Prize", value=prize, inline=True)
         success_embed.add_field(name="Duration", value=duration, inline=True)
         success_embed.add_field(name="Winners", value=str(winners), inline=True)
         
-        await interaction.edit_original_response(content=None, embed=success_embed)
+        await interaction.followup.send(embed=success_embed, ephemeral=True)
     
     @app_commands.command(name="gend", description="🏁 End a giveaway early")
     @app_commands.describe(message_id="Message ID of the giveaway to end")
@@ -311,20 +527,26 @@ class Giveaways(commands.Cog):
             "message_id": message_id,
             "guild_id": interaction.guild.id,
             "status": "active"
-        })
+        }, GIVEAWAY_RESULT_FIELDS)
         
         if not giveaway:
             embed = EmbedBuilder.error("No active giveaway found with that message ID!")
             await interaction.response.send_message(embed=embed, ephemeral=True)
             return
         
-        await interaction.response.send_message("Ending giveaway...", ephemeral=True)
+        await interaction.response.defer(ephemeral=True, thinking=True)
         
         # End the giveaway
-        await self.end_giveaway(giveaway)
+        try:
+            await self.end_giveaways([giveaway])
+        except PyMongoError as e:
+            logger.error(f"Error ending giveaway {giveaway['_id']}: {e}")
+            embed = EmbedBuilder.error("Couldn't end the giveaway right now, please try again!")
+            await interaction.followup.send(embed=embed, ephemeral=True)
+            return
         
         embed = EmbedBuilder.success("Giveaway ended successfully!")
-        await interaction.edit_original_response(embed=embed)
+        await interaction.followup.send(embed=embed, ephemeral=True)
     
     @app_commands.command(name="greroll", description="🔄 Reroll giveaway winners")
     @app_commands.describe(message_id="Message ID of the giveaway to reroll")
@@ -346,23 +568,21 @@ class Giveaways(commands.Cog):
             "message_id": message_id,
             "guild_id": interaction.guild.id,
             "status": "ended"
-        })
+        }, GIVEAWAY_RESULT_FIELDS)
         
         if not giveaway:
             embed = EmbedBuilder.error("No ended giveaway found with that message ID!")
             await interaction.response.send_message(embed=embed, ephemeral=True)
             return
         
-        entries = giveaway.get("entries", [])
-        winner_count = min(giveaway["winner_count"], len(entries))
+        # Pick new winners
+        new_winners, _ = await self.pick_winners(giveaway)
         
-        if winner_count == 0:
+        if not new_winners:
             embed = EmbedBuilder.error("Cannot reroll - no entries in this giveaway!")
             await interaction.response.send_message(embed=embed, ephemeral=True)
             return
         
-        # Pick new winners
-        new_winners = random.sample(entries, winner_count)
         winner_mentions = [f"<@{winner_id}>" for winner_id in new_winners]
         
         # Update database
@@ -381,27 +601,12 @@ class Giveaways(commands.Cog):
     
     def parse_duration(self, duration_str: str) -> int:
         """Parse duration string into seconds"""
-        duration_str = duration_str.lower().strip()
-        
-        # Extract number and unit
-        import re
-        match = re.match(r'^(\d+)([smhdw])$', duration_str)
+        match = DURATION_PATTERN.match(duration_str.lower().strip())
         if not match:
             raise ValueError("Invalid duration format! Use: 30s, 5m, 2h, 3d, 1w")
         
         amount, unit = match.groups()
-        amount = int(amount)
-        
-        multipliers = {
-            's': 1,
-            'm': 60,
-            'h': 3600,
-            'd': 86400,
-            'w': 604800
-        }
-        
-        return amount * multipliers[unit]
-
+        return int(amount) * DURATION_MULTIPLIERS[unit]
 
 async def setup(bot: commands.Bot):
     """Setup function for loading the cog"""
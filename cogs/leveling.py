@@ -5,27 +5,57 @@ Provides XP and ranking system functionality.
 
 import math
 import random
-from datetime import datetime, timedelta
-from typing import Optional
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Optional, Tuple
 
 import discord
 from discord import app_commands
 from discord.ext import commands
+from pymongo import ReturnDocument
 
 from utils.embeds import EmbedBuilder
 
+# Seconds between XP awards for the same member
+XP_COOLDOWN = 60
+
+
+class ConfirmView(discord.ui.View):
+    """Confirmation prompt for resetting XP data"""
+    
+    def __init__(self):
+        super().__init__(timeout=30)
+        self.confirmed = False
+    
+    @discord.ui.button(label="Confirm Reset", style=discord.ButtonStyle.red)
+    async def confirm(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.confirmed = True
+        await interaction.response.defer()
+        self.stop()
+    
+    @discord.ui.button(label="Cancel", style=discord.ButtonStyle.secondary)
+    async def cancel(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await interaction.response.defer()
+        self.stop()
+
 
 class Leveling(commands.Cog):
     """XP and leveling system"""
     
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.xp_cooldowns = {}  # Simple in-memory cooldown tracking
+        # Last XP award per member, oldest first: (user_id, guild_id) -> monotonic time
+        self.xp_cooldowns: OrderedDict = OrderedDict()
+        
+        # Per-guild cache of the leveling toggle: guild_id -> (enabled, cached_at)
+        self._leveling_enabled_cache: Dict[int, Tuple[bool, float]] = {}
+        self._cache_ttl = 60
     
     def calculate_level(self, xp: int) -> int:
         """Calculate level from XP"""
-        # Formula: level = sqrt(xp / 100)
-        return int(math.sqrt(xp / 100))
+        # Formula: level = sqrt(xp / 100), in exact integer arithmetic
+        return math.isqrt(xp // 100)
     
     def calculate_xp_for_level(self, level: int) -> int:
         """Calculate XP needed for a specific level"""
@@ -37,31 +67,44 @@ class Leveling(commands.Cog):
         next_level_xp = self.calculate_xp_for_level(current_level + 1)
         return next_level_xp - current_xp
     
+    async def _is_leveling_enabled(self, guild_id: int) -> bool:
+        """Check if leveling is enabled for a guild, using the in-process cache"""
+        cached = self._leveling_enabled_cache.get(guild_id)
+        if cached and time.monotonic() - cached[1] < self._cache_ttl:
+            return cached[0]
+        
+        server_data = await self.bot.db.server_settings.find_one({"guild_id": guild_id}, {"leveling_enabled": 1})
+        enabled = server_data.get("leveling_enabled", True) if server_data else True
+        self._leveling_enabled_cache[guild_id] = (enabled, time.monotonic())
+        return enabled
+    
     async def get_user_data(self, user_id: int, guild_id: int) -> dict:
         """Get user's leveling data"""
         data = await self.bot.db.leveling.find_one({
             "user_id": user_id,
             "guild_id": guild_id
-        })
+        }, {"xp": 1, "messages": 1})
         
         if not data:
             return {"user_id": user_id, "guild_id": guild_id, "xp": 0, "messages": 0}
         
         return data
     
-    async def add_xp(self, user_id: int, guild_id: int, xp_gained: int) -> dict:
-        """Add XP to user and return updated data"""
+    async def add_xp(self, user_id: int, guild_id: int, xp_gained: int, username: str) -> dict:
+        """Add XP to user and return their XP and message count from before the update"""
         result = await self.bot.db.leveling.find_one_and_update(
             {"user_id": user_id, "guild_id": guild_id},
             {
                 "$inc": {"xp": xp_gained, "messages": 1},
-                "$set": {"last_message": datetime.utcnow()}
+                # The stored name lets the leaderboard render without user lookups
+                "$set": {"last_message": datetime.utcnow(), "username": username}
             },
+            projection={"xp": 1, "messages": 1, "_id": 0},
             upsert=True,
-            return_document=True
+            return_document=ReturnDocument.BEFORE
         )
         
-        return result
+        return result or {"xp": 0, "messages": 0}
     
     @app_commands.command(name="rank", description="📊 Check your or someone's rank")
     @app_commands.describe(user="User to check rank for (optional)")
@@ -77,29 +120,20 @@ class Leveling(commands.Cog):
         user_data = await self.get_user_data(target.id, interaction.guild.id)
         current_xp = user_data["xp"]
         current_level = self.calculate_level(current_xp)
-        xp_for_next = self.calculate_xp_for_next_level(current_xp)
         xp_for_current_level = self.calculate_xp_for_level(current_level)
+        xp_for_next_level = self.calculate_xp_for_level(current_level + 1)
+        xp_for_next = xp_for_next_level - current_xp
         progress_xp = current_xp - xp_for_current_level
-        progress_needed = self.calculate_xp_for_level(current_level + 1) - xp_for_current_level
-        
-        # Calculate server rank
-        pipeline = [
-            {"$match": {"guild_id": interaction.guild.id}},
-            {"$sort": {"xp": -1}},
-            {"$group": {
-                "_id": None,
-                "users": {"$push": {"user_id": "$user_id", "xp": "$xp"}}
-            }}
-        ]
-        
-        result = await self.bot.db.leveling.aggregate(pipeline).to_list(length=1)
-        rank = "N/A"
+        progress_needed = xp_for_next_level - xp_for_current_level
         
-        if result and result[0]["users"]:
-            for i, user_rank in enumerate(result[0]["users"], 1):
-                if user_rank["user_id"] == target.id:
-                    rank = f"#{i}"
-                    break
+        # Calculate server rank: one more than the members with strictly more XP
+        rank = "N/A"
+        if "_id" in user_data:
+            ahead = await self.bot.db.leveling.count_documents({
+                "guild_id": interaction.guild.id,
+                "xp": {"$gt": current_xp}
+            })
+            rank = f"#{ahead + 1}"
         
         embed = EmbedBuilder.create(
             title=f"📊 {target.display_name}'s Rank",
@@ -132,9 +166,10 @@ class Leveling(commands.Cog):
         """Show server XP leaderboard"""
         await interaction.response.defer()
         
-        # Get top 10 users by XP
+        # Get top 10 users by XP (an index-backed top-K scan; keep the sort directly on the match)
         cursor = self.bot.db.leveling.find(
-            {"guild_id": interaction.guild.id}
+            {"guild_id": interaction.guild.id},
+            {"user_id": 1, "xp": 1, "username": 1, "_id": 0}
         ).sort("xp", -1).limit(10)
         
         users = await cursor.to_list(length=10)
@@ -156,23 +191,24 @@ class Leveling(commands.Cog):
         
         leaderboard_text = ""
         for i, user_data in enumerate(users, 1):
-            try:
-                user = self.bot.get_user(user_data["user_id"])
-                if user:
-                    level = self.calculate_level(user_data["xp"])
-                    
-                    if i == 1:
-                        emoji = "🥇"
-                    elif i == 2:
-                        emoji = "🥈"
-                    elif i == 3:
-                        emoji = "🥉"
-                    else:
-                        emoji = f"{i}."
-                    
-                    leaderboard_text += f"{emoji} **{user.display_name}** - Level {level} ({user_data['xp']:,} XP)\n"
-            except:
-                continue
+            name = user_data.get("username")
+            if not name:
+                # Members who haven't earned XP since names were stored
+                member = interaction.guild.get_member(user_data["user_id"])
+                name = member.display_name if member else f"<@{user_data['user_id']}>"
+            
+            level = self.calculate_level(user_data["xp"])
+            
+            if i == 1:
+                emoji = "🥇"
+            elif i == 2:
+                emoji = "🥈"
+            elif i == 3:
+                emoji = "🥉"
+            else:
+                emoji = f"{i}."
+            
+            leaderboard_text += f"{emoji} **{name}** - Level {level} ({user_data['xp']:,} XP)\n"
         
         if leaderboard_text:
             embed.add_field(name="Rankings", value=leaderboard_text, inline=False)
@@ -187,18 +223,16 @@ class Leveling(commands.Cog):
             await interaction.response.send_message(embed=embed, ephemeral=True)
             return
         
-        # Get current setting
-        server_data = await self.bot.db.server_settings.find_one({"guild_id": interaction.guild.id})
-        current_setting = server_data.get("leveling_enabled", True) if server_data else True
-        
-        # Toggle setting
-        new_setting = not current_setting
-        
-        await self.bot.db.server_settings.update_one(
+        # Flip the setting and read it back in one atomic round-trip
+        server_data = await self.bot.db.server_settings.find_one_and_update(
             {"guild_id": interaction.guild.id},
-            {"$set": {"leveling_enabled": new_setting}},
-            upsert=True
+            [{"$set": {"leveling_enabled": {"$not": [{"$ifNull": ["$leveling_enabled", True]}]}}}],
+            projection={"leveling_enabled": 1},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
         )
+        new_setting = server_data["leveling_enabled"]
+        self._leveling_enabled_cache[interaction.guild.id] = (new_setting, time.monotonic())
         
         status = "enabled" if new_setting else "disabled"
         embed = EmbedBuilder.success(f"XP system has been **{status}** for this server!")
@@ -228,23 +262,6 @@ class Leveling(commands.Cog):
             await interaction.response.send_message(embed=embed, ephemeral=True)
             return
         
-        # Create confirmation view
-        class ConfirmView(discord.ui.View):
-            def __init__(self):
-                super().__init__(timeout=30)
-                self.confirmed = False
-            
-            @discord.ui.button(label="Confirm Reset", style=discord.ButtonStyle.red)
-            async def confirm(self, interaction, button):
-                self.confirmed = True
-                await interaction.response.defer()
-                self.stop()
-            
-            @discord.ui.button(label="Cancel", style=discord.ButtonStyle.secondary)
-            async def cancel(self, interaction, button):
-                await interaction.response.defer()
-                self.stop()
-        
         embed = EmbedBuilder.create(
             title="🗑️ Reset XP Data",
             description=f"⚠️ **WARNING** ⚠️\n\nThis will permanently delete XP data for {count} members!\n\n**This action cannot be undone!**",
@@ -256,7 +273,7 @@ class Leveling(commands.Cog):
         await view.wait()
         
         if view.confirmed:
-          result = await self.bot.db.leveling.delete_many({"guild_id": interaction.guild.id})
+            result = await self.bot.db.leveling.delete_many({"guild_id": interaction.guild.id})
             embed = EmbedBuilder.success(f"Reset complete! Deleted XP data for {result.deleted_count} members.")
         else:
             embed = EmbedBuilder.create(
@@ -279,30 +296,34 @@ class Leveling(commands.Cog):
             return
         
         # Check if leveling is enabled
-        server_data = await self.bot.db.server_settings.find_one({"guild_id": message.guild.id})
-        if server_data and not server_data.get("leveling_enabled", True):
+        if not await self._is_leveling_enabled(message.guild.id):
             return
         
         # Check cooldown (1 minute)
-        user_key = f"{message.author.id}_{message.guild.id}"
-        now = datetime.utcnow()
+        user_key = (message.author.id, message.guild.id)
+        now = time.monotonic()
         
-        if user_key in self.xp_cooldowns:
-            if now - self.xp_cooldowns[user_key] < timedelta(minutes=1):
-                return
+        last_award = self.xp_cooldowns.get(user_key)
+        if last_award is not None and now - last_award < XP_COOLDOWN:
+            return
         
         self.xp_cooldowns[user_key] = now
+        self.xp_cooldowns.move_to_end(user_key)
+        
+        # Forget members whose cooldown has run out so the map only holds the last minute's authors
+        while now - next(iter(self.xp_cooldowns.values())) >= XP_COOLDOWN:
+            self.xp_cooldowns.popitem(last=False)
         
         # Award XP (15-25 per message)
         xp_gained = random.randint(15, 25)
         
-        # Get user data before update
-        old_data = await self.get_user_data(message.author.id, message.guild.id)
-        old_level = self.calculate_level(old_data["xp"])
+        # Add XP; the previous totals come back from the same write
+        old_data = await self.add_xp(message.author.id, message.guild.id, xp_gained, message.author.display_name)
+        new_xp = old_data["xp"] + xp_gained
+        messages = old_data.get("messages", 0) + 1
         
-        # Add XP
-        new_data = await self.add_xp(message.author.id, message.guild.id, xp_gained)
-        new_level = self.calculate_level(new_data["xp"])
+        old_level = self.calculate_level(old_data["xp"])
+        new_level = self.calculate_level(new_xp)
         
         # Check for level up
         if new_level > old_level:
@@ -311,8 +332,8 @@ class Leveling(commands.Cog):
                 description=f"Congratulations {message.author.mention}! You reached **Level {new_level}**!",
                 color=discord.Color.from_rgb(255, 215, 0)
             )
-            embed.add_field(name="Total XP", value=f"{new_data['xp']:,}", inline=True)
-            embed.add_field(name="Messages Sent", value=f"{new_data['messages']:,}", inline=True)
+            embed.add_field(name="Total XP", value=f"{new_xp:,}", inline=True)
+            embed.add_field(name="Messages Sent", value=f"{messages:,}", inline=True)
             
             # Check for level rewards (placeholder)
             if new_level % 10 == 0:  # Every 10 levels
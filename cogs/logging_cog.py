@@ -3,8 +3,9 @@ Logging cog for Nova bot
 Provides server event logging functionality.
 """
 
-from datetime import datetime
-from typing import Optional
+import asyncio
+import logging
+from typing import Dict, List, Optional, Set
 
 import discord
 from discord import app_commands
@@ -12,12 +13,51 @@ from discord.ext import commands
 
 from utils.embeds import EmbedBuilder
 
+logger = logging.getLogger(__name__)
+
+# Seconds to gather log events before sending them together
+LOG_BATCH_DELAY = 0.25
+
+# Display names for channel types in channel logs
+CHANNEL_TYPE_NAMES = {
+    discord.ChannelType.text: "Text",
+    discord.ChannelType.voice: "Voice",
+    discord.ChannelType.category: "Category",
+    discord.ChannelType.news: "News",
+    discord.ChannelType.stage_voice: "Stage",
+    discord.ChannelType.forum: "Forum"
+}
+
+# Discord's per-message limits on embed count and total embed characters
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_EMBED_CHARS_PER_MESSAGE = 6000
+
 
 class Logging(commands.Cog):
     """Server event logging system"""
     
     def __init__(self, bot: commands.Bot):
         self.bot = bot
+        
+        # Log channels of the guilds that have logging enabled: guild_id -> channel_id
+        self._log_channels: Dict[int, int] = {}
+        
+        # Log embeds waiting to be sent: channel_id -> [embed, ...]
+        self._pending_logs: Dict[int, List[discord.Embed]] = {}
+        
+        # Running flush tasks, referenced here so they aren't garbage collected mid-send
+        self._flush_tasks: Set[asyncio.Task] = set()
+    
+    async def cog_load(self):
+        """Load the log channel of every guild with logging enabled"""
+        try:
+            async for settings in self.bot.db.server_settings.find(
+                {"log_channel": {"$exists": True}},
+                {"guild_id": 1, "log_channel": 1}
+            ):
+                self._log_channels[settings["guild_id"]] = settings["log_channel"]
+        except Exception as e:
+            print(f"Error loading log channels: {e}")
     
     @app_commands.command(name="log-channel", description="📋 Set the logging channel")
     @app_commands.describe(channel="Channel to send log messages to")
@@ -39,6 +79,7 @@ class Logging(commands.Cog):
             {"$set": {"log_channel": channel.id}},
             upsert=True
         )
+        self._log_channels[interaction.guild.id] = channel.id
         
         embed = EmbedBuilder.success(f"Log channel set to {channel.mention}!")
         embed.add_field(
@@ -56,7 +97,7 @@ class Logging(commands.Cog):
             color=discord.Color.green()
         )
         test_embed.add_field(name="Set by", value=interaction.user.mention, inline=True)
-        test_embed.timestamp = datetime.utcnow()
+        test_embed.timestamp = discord.utils.utcnow()
         
         await channel.send(embed=test_embed)
     
@@ -72,6 +113,7 @@ class Logging(commands.Cog):
             {"guild_id": interaction.guild.id},
             {"$unset": {"log_channel": ""}}
         )
+        self._log_channels.pop(interaction.guild.id, None)
         
         if result.modified_count > 0:
             embed = EmbedBuilder.success("Server logging has been disabled!")
@@ -80,20 +122,50 @@ class Logging(commands.Cog):
         
         await interaction.response.send_message(embed=embed)
     
-    async def get_log_channel(self, guild: discord.Guild) -> Optional[discord.TextChannel]:
-        """Get the log channel for a guild"""
+    def get_log_channel(self, guild: discord.Guild) -> Optional[discord.TextChannel]:
+        """Get the log channel for a guild; guilds without logging never touch the database"""
+        channel_id = self._log_channels.get(guild.id)
+        return guild.get_channel(channel_id) if channel_id else None
+    
+    def queue_log(self, log_channel: discord.TextChannel, embed: discord.Embed) -> None:
+        """Queue a log embed; events arriving close together are sent as one message"""
+        pending = self._pending_logs.get(log_channel.id)
+        if pending is None:
+            self._pending_logs[log_channel.id] = [embed]
+            task = asyncio.create_task(self.flush_logs(log_channel))
+            self._flush_tasks.add(task)
+            task.add_done_callback(self._flush_tasks.discard)
+        else:
+            pending.append(embed)
+    
+    async def flush_logs(self, log_channel: discord.TextChannel):
+        """Send a channel's queued log embeds, packing as many into each message as Discord allows"""
+        await asyncio.sleep(LOG_BATCH_DELAY)
+        embeds = self._pending_logs.pop(log_channel.id)
+        
+        batch = []
+        batch_chars = 0
+        for embed in embeds:
+            if batch and (len(batch) == MAX_EMBEDS_PER_MESSAGE or batch_chars + len(embed) > MAX_EMBED_CHARS_PER_MESSAGE):
+                await self.send_logs(log_channel, batch)
+                batch = []
+                batch_chars = 0
+            batch.append(embed)
+            batch_chars += len(embed)
+        
+        await self.send_logs(log_channel, batch)
+    
+    async def send_logs(self, log_channel: discord.TextChannel, embeds: List[discord.Embed]):
+        """Send one message of log embeds"""
         try:
-            log_data = await self.bot.db.server_settings.find_one({"guild_id": guild.id})
-            if log_data and "log_channel" in log_data:
-                return guild.get_channel(log_data["log_channel"])
-        except:
-            pass
-        return None
+            await log_channel.send(embeds=embeds)
+        except discord.HTTPException as e:
+            logger.warning(f"Failed to send {len(embeds)} log embeds to channel {log_channel.id}: {e}")
     
     @commands.Cog.listener()
     async def on_member_join(self, member: discord.Member):
         """Log member joins"""
-        log_channel = await self.get_log_channel(member.guild)
+        log_channel = self.get_log_channel(member.guild)
         if not log_channel:
             return
         
@@ -110,17 +182,14 @@ class Logging(commands.Cog):
         if member.avatar:
             embed.set_thumbnail(url=member.avatar.url)
         
-        embed.timestamp = datetime.utcnow()
+        embed.timestamp = discord.utils.utcnow()
         
-        try:
-            await log_channel.send(embed=embed)
-        except:
-            pass
+        self.queue_log(log_channel, embed)
     
     @commands.Cog.listener()
     async def on_member_remove(self, member: discord.Member):
         """Log member leaves"""
-        log_channel = await self.get_log_channel(member.guild)
+        log_channel = self.get_log_channel(member.guild)
         if not log_channel:
             return
         
@@ -138,12 +207,9 @@ class Logging(commands.Cog):
         if member.avatar:
             embed.set_thumbnail(url=member.avatar.url)
         
-        embed.timestamp = datetime.utcnow()
+        embed.timestamp = discord.utils.utcnow()
         
-        try:
-            await log_channel.send(embed=embed)
-        except:
-            pass
+        self.queue_log(log_channel, embed)
     
     @commands.Cog.listener()
     async def on_message_edit(self, before: discord.Message, after: discord.Message):
@@ -156,7 +222,7 @@ class Logging(commands.Cog):
         if before.content == after.content:
             return
         
-        log_channel = await self.get_log_channel(before.guild)
+        log_channel = self.get_log_channel(before.guild)
         if not log_channel:
             return
         
@@ -176,12 +242,9 @@ class Logging(commands.Cog):
         embed.add_field(name="Before", value=before_content or "*No content*", inline=False)
         embed.add_field(name="After", value=after_content or "*No content*", inline=False)
         
-        embed.timestamp = datetime.utcnow()
+        embed.timestamp = discord.utils.utcnow()
         
-        try:
-            await log_channel.send(embed=embed)
-        except:
-            pass
+        self.queue_log(log_channel, embed)
     
     @commands.Cog.listener()
     async def on_message_delete(self, message: discord.Message):
@@ -194,7 +257,7 @@ class Logging(commands.Cog):
         if not message.guild:
             return
         
-        log_channel = await self.get_log_channel(message.guild)
+        log_channel = self.get_log_channel(message.guild)
         if not log_channel:
             return
         
@@ -216,24 +279,29 @@ class Logging(commands.Cog):
             attachment_names = [att.filename for att in message.attachments]
             embed.add_field(name="Attachments", value=", ".join(attachment_names), inline=False)
         
-        embed.timestamp = datetime.utcnow()
+        embed.timestamp = discord.utils.utcnow()
         
-        try:
-            await log_channel.send(embed=embed)
-        except:
-            pass
+        self.queue_log(log_channel, embed)
     
     @commands.Cog.listener()
     async def on_member_update(self, before: discord.Member, after: discord.Member):
         """Log member updates (roles, nickname)"""
-        log_channel = await self.get_log_channel(before.guild)
+        # Most updates change neither, so skip them before looking up the log channel
+        roles_changed = before.roles != after.roles
+        nick_changed = before.nick != after.nick
+        if not roles_changed and not nick_changed:
+            return
+        
+        log_channel = self.get_log_channel(before.guild)
         if not log_channel:
             return
         
         # Check for role changes
-        if before.roles != after.roles:
-            added_roles = set(after.roles) - set(before.roles)
-            removed_roles = set(before.roles) - set(after.roles)
+        if roles_changed:
+            before_roles = set(before.roles)
+            after_roles = set(after.roles)
+            added_roles = after_roles - before_roles
+            removed_roles = before_roles - after_roles
             
             if added_roles or removed_roles:
                 embed = EmbedBuilder.create(
@@ -251,15 +319,12 @@ class Logging(commands.Cog):
                     role_list = ", ".join([role.mention for role in removed_roles])
                     embed.add_field(name="Roles Removed", value=role_list, inline=False)
                 
-                embed.timestamp = datetime.utcnow()
+                embed.timestamp = discord.utils.utcnow()
                 
-                try:
-                    await log_channel.send(embed=embed)
-                except:
-                    pass
+                self.queue_log(log_channel, embed)
         
         # Check for nickname changes
-        if before.nick != after.nick:
+        if nick_changed:
             embed = EmbedBuilder.create(
                 title="📝 Nickname Changed",
                 color=discord.Color.blue()
@@ -269,17 +334,14 @@ class Logging(commands.Cog):
             embed.add_field(name="Before", value=before.nick or before.name, inline=True)
             embed.add_field(name="After", value=after.nick or after.name, inline=True)
             
-            embed.timestamp = datetime.utcnow()
+            embed.timestamp = discord.utils.utcnow()
             
-            try:
-                await log_channel.send(embed=embed)
-            except:
-                pass
+            self.queue_log(log_channel, embed)
     
     @commands.Cog.listener()
     async def on_guild_channel_create(self, channel: discord.abc.GuildChannel):
         """Log channel creation"""
-        log_channel = await self.get_log_channel(channel.guild)
+        log_channel = self.get_log_channel(channel.guild)
         if not log_channel:
             return
         
@@ -289,23 +351,21 @@ class Logging(commands.Cog):
             color=discord.Color.green()
         )
         
-        embed.add_field(name="Channel", value=channel.mention if hasattr(channel, 'mention') else channel.name, inline=True)
-        embed.add_field(name="Type", value=str(channel.type).title(), inline=True)
+        embed.add_field(name="Channel", value=getattr(channel, "mention", channel.name), inline=True)
+        embed.add_field(name="Type", value=CHANNEL_TYPE_NAMES.get(channel.type, "Other"), inline=True)
         
-        if hasattr(channel, 'category') and channel.category:
-            embed.add_field(name="Category", value=channel.category.name, inline=True)
+        category = getattr(channel, "category", None)
+        if category:
+            embed.add_field(name="Category", value=category.name, inline=True)
         
-        embed.timestamp = datetime.utcnow()
+        embed.timestamp = discord.utils.utcnow()
         
-        try:
-            await log_channel.send(embed=embed)
-        except:
-            pass
+        self.queue_log(log_channel, embed)
     
     @commands.Cog.listener()
     async def on_guild_channel_delete(self, channel: discord.abc.GuildChannel):
         """Log channel deletion"""
-        log_channel = await self.get_log_channel(channel.guild)
+        log_channel = self.get_log_channel(channel.guild)
         if not log_channel or log_channel.id == channel.id:
             return
         
@@ -316,18 +376,16 @@ class Logging(commands.Cog):
         )
         
         embed.add_field(name="Channel Name", value=channel.name, inline=True)
-        embed.add_field(name="Type", value=str(channel.type).title(), inline=True)
+        embed.add_field(name="Type", value=CHANNEL_TYPE_NAMES.get(channel.type, "Other"), inline=True)
         embed.add_field(name="ID", value=str(channel.id), inline=True)
         
-        if hasattr(channel, 'category') and channel.category:
-            embed.add_field(name="Category", value=channel.category.name, inline=True)
+        category = getattr(channel, "category", None)
+        if category:
+            embed.add_field(name="Category", value=category.name, inline=True)
         
-        embed.timestamp = datetime.utcnow()
+        embed.timestamp = discord.utils.utcnow()
         
-        try:
-            await log_channel.send(embed=embed)
-        except:
-            pass
+        self.queue_log(log_channel, embed)
 
 
 async def setup(bot: commands.Bot):
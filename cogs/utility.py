@@ -25,6 +25,11 @@ class Utility(commands.Cog):
         """Display server information"""
         guild = interaction.guild
         
+        # Member lists aren't chunked at startup, so fetch this one on first use
+        if not guild.chunked:
+            await interaction.response.defer()
+            await guild.chunk()
+        
         embed = EmbedBuilder.create(
             title=f"📊 {guild.name}",
             color=discord.Color.from_rgb(135, 206, 235)
@@ -57,7 +62,10 @@ class Utility(commands.Cog):
         embed.add_field(name="Boosts", value=str(guild.premium_subscription_count), inline=True)
         embed.add_field(name="Verification", value=str(guild.verification_level).title(), inline=True)
         
-        await interaction.response.send_message(embed=embed)
+        if interaction.response.is_done():
+            await interaction.followup.send(embed=embed)
+        else:
+            await interaction.response.send_message(embed=embed)
     
     @app_commands.command(name="userinfo", description="👤 Get information about a user")
     @app_commands.describe(user="The user to get information about (defaults to you)")
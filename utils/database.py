@@ -4,9 +4,13 @@ Provides MongoDB connection and helper functions.
 """
 
 import asyncio
+import logging
 from typing import Optional
 
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo.errors import PyMongoError
+
+logger = logging.getLogger(__name__)
 
 
 class Database:
@@ -20,8 +24,18 @@ class Database:
     async def connect(self) -> None:
         """Connect to MongoDB"""
         try:
+            # Keep a warm, bounded pool so bursts of commands reuse connections
+            # instead of opening new ones on the user-visible path
             self.client = AsyncIOMotorClient(
                 self.connection_string,
+                maxPoolSize=50,
+                minPoolSize=10,
+                maxIdleTimeMS=60000,
+                waitQueueTimeoutMS=2000,
+                retryWrites=True,
+                # Compression is negotiated with the server; zlib needs no extra package
+                compressors="zstd,snappy,zlib",
+                zlibCompressionLevel=-1,
                 serverSelectionTimeoutMS=5000
             )
             
@@ -43,6 +57,70 @@ class Database:
             self.client.close()
             print("MongoDB connection closed")
     
+    async def create_indexes(self) -> None:
+        """Create the indexes used by the bot's hot query paths"""
+        # Unique indexes that commands rely on to reject duplicates; running without
+        # one silently breaks that, so a failure here stops startup. Each entry also
+        # names the sort that picks which document survives if duplicates already exist
+        unique_indexes = [
+            (self.autoroles, [("guild_id", 1), ("role_id", 1)], [("_id", 1)]),
+            (self.server_settings, [("guild_id", 1)], [("_id", 1)]),
+            (self.tags, [("guild_id", 1), ("name", 1)], [("uses", -1), ("_id", 1)]),
+            (self.economy, [("guild_id", 1), ("user_id", 1)], [("balance", -1), ("_id", 1)]),
+            (self.leveling, [("guild_id", 1), ("user_id", 1)], [("xp", -1), ("_id", 1)]),
+            (self.giveaways, [("message_id", 1)], [("_id", 1)]),
+            (self.giveaway_entries, [("giveaway_id", 1), ("user_id", 1)], [("_id", 1)]),
+        ]
+        
+        for collection, keys, keep_sort in unique_indexes:
+            try:
+                existing = await collection.index_information()
+                if not any(info.get("unique") and info["key"] == keys for info in existing.values()):
+                    await self.drop_duplicates(collection, keys, keep_sort)
+                await collection.create_index(keys, unique=True)
+            except PyMongoError as e:
+                logger.critical(f"Failed to create unique index {keys} on {collection.name}: {e}")
+                raise
+        
+        # Indexes that only speed up queries (or expire data); the bot works without them
+        indexes = [
+            (self.ai_cache, [("created_at", 1)], {"expireAfterSeconds": 86400}),
+            (self.tags, [("guild_id", 1), ("uses", -1)], {}),
+            (self.tags, [("guild_id", 1), ("name", "text"), ("content", "text")], {"weights": {"name": 5, "content": 1}}),
+            (self.economy, [("guild_id", 1), ("balance", -1)], {}),
+            (self.leveling, [("guild_id", 1), ("xp", -1)], {}),
+            (self.giveaways, [("status", 1), ("end_time", 1)], {}),
+        ]
+        
+        for collection, keys, options in indexes:
+            try:
+                await collection.create_index(keys, **options)
+            except PyMongoError as e:
+                logger.error(f"Failed to create index {keys} on {collection.name}: {e}")
+    
+    async def drop_duplicates(self, collection, keys: list, keep_sort: list) -> None:
+        """Delete documents sharing a unique key, keeping the first one by keep_sort"""
+        pipeline = [
+            {"$sort": dict(keep_sort)},
+            {"$group": {
+                "_id": {field: f"${field}" for field, _ in keys},
+                "ids": {"$push": "$_id"},
+                "count": {"$sum": 1}
+            }},
+            {"$match": {"count": {"$gt": 1}}}
+        ]
+        
+        extra_ids = []
+        async for group in collection.aggregate(pipeline, allowDiskUse=True):
+            extra_ids.extend(group["ids"][1:])
+        
+        if extra_ids:
+            result = await collection.delete_many({"_id": {"$in": extra_ids}})
+            logger.warning(
+                f"Removed {result.deleted_count} duplicate documents from {collection.name} "
+                f"before creating unique index {keys}"
+            )
+    
     # Collection properties for easy access
     @property
     def server_settings(self):
@@ -74,6 +152,11 @@ class Database:
         """Giveaways collection"""
         return self.db.giveaways
     
+    @property
+    def giveaway_entries(self):
+        """Giveaway entries collection (one document per entrant)"""
+        return self.db.giveaway_entries
+    
     @property
     def autoroles(self):
         """Autoroles collection"""
@@ -89,6 +172,16 @@ class Database:
         """Music playlists collection"""
         return self.db.music_playlists
     
+    @property
+    def ai_batch_jobs(self):
+        """Submitted OpenAI batch jobs collection"""
+        return self.db.ai_batch_jobs
+    
+    @property
+    def ai_cache(self):
+        """Cached /ask answers collection"""
+        return self.db.ai_cache
+    
     # Helper methods
     async def get_server_settings(self, guild_id: int) -> dict:
         """Get server settings with defaults"""
@@ -143,4 +236,4 @@ class Database:
             # This would need bot instance to check if roles/guilds exist
             pass
         except Exception as e:
-            print(f"Error during cleanup
+            print(f"Error during cleanup: {e}")